@@ -0,0 +1,44 @@
+import argparse
+import json
+from typing import Dict, Optional, Tuple
+
+KEY_FIELDS = ["benchmark", "name", "size", "ecmp", "nodes"]
+METRICS = ["time", "peak_memory", "import_time"]
+
+
+def result_key(result: Dict) -> Tuple:
+    """Key to match a result between benchmark runs"""
+    return tuple(result.get(k) for k in KEY_FIELDS)
+
+
+def load_results(file_path: str) -> Dict[Tuple, Dict]:
+    """Load results of a benchmark run (output of run_benchmark.py)"""
+    with open(file_path, "r", encoding="UTF-8") as file_io:
+        data = json.load(file_io)
+    return {result_key(r): r for r in data["results"]}
+
+
+def ratio(base: Optional[float], target: Optional[float]) -> str:
+    """Ratio of target to base"""
+    return f"{target / base:.2f}x" if base and target is not None else "-"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare results of two benchmark runs")
+    parser.add_argument("base", type=str, help="Base result (JSON)")
+    parser.add_argument("target", type=str, help="Target result (JSON)")
+    args = parser.parse_args()
+
+    base_results = load_results(args.base)
+    target_results = load_results(args.target)
+    print("\t".join(KEY_FIELDS + [f"{m} ({n})" for m in METRICS for n in ["base", "target", "ratio"]]))
+    for key, target_result in target_results.items():
+        base_result = base_results.get(key)
+        if base_result is None:
+            continue
+        columns = ["" if v is None else str(v) for v in key]
+        for metric in METRICS:
+            base_value, target_value = base_result.get(metric), target_result.get(metric)
+            columns += ["-" if v is None else str(v) for v in (base_value, target_value)]
+            columns.append(ratio(base_value, target_value))
+        print("\t".join(columns))
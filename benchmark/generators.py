@@ -0,0 +1,171 @@
+import json
+import random
+from typing import Iterable, Iterator, List, Tuple
+
+# prefix, nexthops (ip address and interface index) and metric
+RouteSpec = Tuple[str, List[Tuple[str, int]], int]
+# neighbor address, interface index, neighbor id and state
+OspfSpec = Tuple[str, int, str, str]
+
+PREFIX_BASE = 10 << 24  # 10.0.0.0
+
+
+def _ipv4(value: int) -> str:
+    return ".".join(str((value >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+
+def juniper_interface(index: int) -> str:
+    """Juniper (and batfish) interface name"""
+    return f"ge-0/0/{index}.0"
+
+
+def cisco_interface(index: int, arista=False) -> str:
+    """Cisco/Arista interface name"""
+    return f"Ethernet{index + 1}" if arista else f"GigabitEthernet0/{index}"
+
+
+def route_specs(size: int, ecmp=1, seed=0, drop_rate=0.0, change_rate=0.0) -> Iterator[RouteSpec]:
+    """Generate routes (/24 prefixes from 10.0.0.0) with ecmp next-hops
+
+    drop_rate and change_rate (metric changed) are used to make a different snapshot from same seed.
+    """
+    rand = random.Random(seed)
+    for index in range(size):
+        drop, change = rand.random(), rand.random()
+        if drop < drop_rate:
+            continue
+        prefix = f"{_ipv4(PREFIX_BASE + (index << 8))}/24"
+        nexthops = [(f"192.168.{k}.1", k) for k in range(ecmp)]
+        yield prefix, nexthops, 20 if change < change_rate else 10
+
+
+def ospf_specs(size: int, seed=0, drop_rate=0.0) -> Iterator[OspfSpec]:
+    """Generate ospf neighbors (a neighbor per interface)"""
+    rand = random.Random(seed)
+    for index in range(size):
+        if rand.random() < drop_rate:
+            continue
+        yield _ipv4((172 << 24) + (16 << 16) + (index << 2) + 1), index, _ipv4((1 << 24) + index), "Full"
+
+
+def _json_array(elements: Iterable) -> Iterator[str]:
+    # stream json array (not to build whole data in memory)
+    yield "["
+    for index, element in enumerate(elements):
+        yield f"{',' if index else ''}\n{json.dumps(element)}"
+    yield "\n]"
+
+
+def _juniper_data(value) -> List:
+    return [{"data": str(value)}]
+
+
+def juniper_route_json(specs: Iterable[RouteSpec]) -> Iterator[str]:
+    """Juniper `show route | display json` (inet.0 and empty inet6.0)"""
+    rts = (
+        {
+            "rt-destination": _juniper_data(prefix),
+            "rt-entry": [
+                {
+                    "protocol-name": _juniper_data("OSPF"),
+                    "preference": _juniper_data(10),
+                    "metric": _juniper_data(metric),
+                    "nh-type": _juniper_data("Router"),
+                    "nh": [
+                        {"to": _juniper_data(ip), "via": _juniper_data(juniper_interface(k))} for ip, k in nexthops
+                    ],
+                }
+            ],
+        }
+        for prefix, nexthops, metric in specs
+    )
+    yield '{"route-information": [{"route-table": [{"table-name": [{"data": "inet.0"}], "rt": '
+    yield from _json_array(rts)
+    yield '}, {"table-name": [{"data": "inet6.0"}], "rt": []}]}]}\n'
+
+
+def cisco_route_text(specs: Iterable[RouteSpec], arista=False) -> Iterator[str]:
+    """Cisco/Arista `show ip route` text"""
+    yield "VRF: default\n" if arista else "Codes: L - local, C - connected, S - static, O - OSPF, B - BGP\n"
+    uptime = "" if arista else "00:01:02, "
+    for prefix, nexthops, metric in specs:
+        for index, (ip, k) in enumerate(nexthops):
+            intf = cisco_interface(k, arista)
+            if index == 0:
+                yield f"{' O' if arista else 'O '}       {prefix} [110/{metric}] via {ip}, {uptime}{intf}\n"
+            else:
+                yield f"                          via {ip}, {uptime}{intf}\n"
+
+
+def batfish_route_json(specs: Iterable[RouteSpec], node: str) -> Iterator[str]:
+    """Batfish routes() query answer (a record per next-hop)"""
+    records = (
+        {
+            "Node": node,
+            "VRF": "default",
+            "Network": prefix,
+            "Next_Hop": {"type": "ip", "ip": ip},
+            "Next_Hop_IP": ip,
+            "Next_Hop_Interface": juniper_interface(k),
+            "Protocol": "ospf",
+            "Metric": metric,
+            "Admin_Distance": 110,
+        }
+        for prefix, nexthops, metric in specs
+        for ip, k in nexthops
+    )
+    yield from _json_array(records)
+
+
+def juniper_ospf_json(specs: Iterable[OspfSpec]) -> Iterator[str]:
+    """Juniper `show ospf neighbor | display json`"""
+    neighbors = (
+        {
+            "neighbor-address": _juniper_data(address),
+            "interface-name": _juniper_data(juniper_interface(k)),
+            "ospf-neighbor-state": _juniper_data(state),
+            "neighbor-id": _juniper_data(neighbor_id),
+            "neighbor-priority": _juniper_data(128),
+        }
+        for address, k, neighbor_id, state in specs
+    )
+    yield '{"ospf-neighbor-information": [{"ospf-neighbor": '
+    yield from _json_array(neighbors)
+    yield "}]}\n"
+
+
+def cisco_ospf_text(specs: Iterable[OspfSpec], arista=False) -> Iterator[str]:
+    """Cisco/Arista `show ip ospf neighbor` text"""
+    if arista:
+        yield "Neighbor ID     Instance VRF      Pri State                  Dead Time   Address         Interface\n"
+    else:
+        yield "Neighbor ID     Pri   State           Dead Time   Address         Interface\n"
+    for address, k, neighbor_id, state in specs:
+        intf = cisco_interface(k, arista)
+        state = state.upper()
+        if arista:
+            yield f"{neighbor_id}         1        default   1   {state}/DR       00:00:35    {address}  {intf}\n"
+        else:
+            yield f"{neighbor_id}         1   {state}/BDR        00:00:35    {address}    {intf}\n"
+
+
+def batfish_ospf_json(specs: Iterable[OspfSpec], node: str) -> Iterator[str]:
+    """Batfish ospfSessionCompatibility() query answer"""
+    records = (
+        {
+            "VRF": "default",
+            "Interface": {"hostname": node, "interface": juniper_interface(k)},
+            "IP": address,
+            "Remote_Interface": {"hostname": f"{node}-peer", "interface": juniper_interface(k)},
+            "Remote_IP": address,
+            "Session_Status": "ESTABLISHED",
+        }
+        for address, k, _, _ in specs
+    )
+    yield from _json_array(records)
+
+
+def write_file(path: str, chunks: Iterable[str]) -> None:
+    """Write generated data (text chunks) to the file"""
+    with open(path, "w", encoding="UTF-8") as file_io:
+        file_io.writelines(chunks)
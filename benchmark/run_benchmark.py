@@ -0,0 +1,376 @@
+# NOTICE: export PYTHONPATH="./src"
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import generators as gen
+from batfish_ospfneigh_table import BatfishOspfNeighborTable
+from batfish_route_table import BatfishRouteTable
+from cisco_ospfneigh_table import CiscoOspfNeighborTable
+from cisco_route_table import CiscoRouteTable
+from juniper_ospfneigh_table import JuniperOspfNeighborTable
+from juniper_route_table import JuniperRouteTable
+from state_checker import StateChecker
+
+BENCH_NODE = "bench-rt1"
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# commands to measure startup (import) time
+STARTUP_COMMANDS = [
+    ["diff_state.py", "--help"],
+    ["diff_state_matrix.py", "--help"],
+    ["bf_state.py", "--help"],
+]
+FLEET_CONFIG = """---
+original:
+  type: original
+  state_dir: {work_dir}/{{{{ network_name }}}}/{{{{ snapshot_name }}}}
+  routes_dir: showroute
+  routes_file: _show_route.txt
+  ospf_neighbors_dir: showospfneigh
+  ospf_neighbors_file: _show_ospf_neigh.txt
+batfish:
+  type: batfish
+  state_dir: {work_dir}/{{{{ network_name }}}}/{{{{ snapshot_name }}}}
+  routes_dir: showroute
+  routes_file: _routes.json
+  ospf_neighbors_dir: showospfneigh
+  ospf_neighbors_file: _ospf_neighbors.json
+original_node_params:
+"""
+
+
+def measure(func: Callable, setup: Optional[Callable] = None, repeat=3) -> Dict:
+    """Measure func: minimum wall time of repeats and peak/retained memory (by tracemalloc) of an extra run
+
+    Result of setup (not measured) is given to func.
+    """
+    times = []
+    for _ in range(repeat):
+        args = [setup()] if setup else []
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+        del result, args
+
+    args = [setup()] if setup else []
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time": round(min(times), 6), "peak_memory": peak, "retained_memory": retained, "result": result}
+
+
+@contextmanager
+def chdir(path: str) -> Iterator[None]:
+    """Change current directory temporarily"""
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def parser_cases(size: int, ecmp: int, ospf_size: int) -> List[Dict]:
+    """Parser benchmark cases: table class, file name and generated data"""
+    return [
+        {
+            "table": JuniperRouteTable,
+            "file": "juniper_route.json",
+            "data": gen.juniper_route_json(gen.route_specs(size, ecmp)),
+            # expanded as StateChecker does
+            "post": lambda t: t.expand_rt_entry(),
+            "size": size,
+        },
+        {
+            "table": CiscoRouteTable,
+            "variant": "cisco",
+            "file": "cisco_route.txt",
+            "data": gen.cisco_route_text(gen.route_specs(size, ecmp)),
+            "size": size,
+        },
+        {
+            "table": CiscoRouteTable,
+            "variant": "arista",
+            "file": "arista_route.txt",
+            "data": gen.cisco_route_text(gen.route_specs(size, ecmp), arista=True),
+            "size": size,
+        },
+        {
+            "table": BatfishRouteTable,
+            "file": "batfish_route.json",
+            "data": gen.batfish_route_json(gen.route_specs(size, ecmp), BENCH_NODE),
+            "size": size,
+        },
+        {
+            "table": JuniperOspfNeighborTable,
+            "file": "juniper_ospf.json",
+            "data": gen.juniper_ospf_json(gen.ospf_specs(ospf_size)),
+            "size": ospf_size,
+        },
+        {
+            "table": CiscoOspfNeighborTable,
+            "variant": "cisco",
+            "file": "cisco_ospf.txt",
+            "data": gen.cisco_ospf_text(gen.ospf_specs(ospf_size)),
+            "size": ospf_size,
+        },
+        {
+            "table": CiscoOspfNeighborTable,
+            "variant": "arista",
+            "file": "arista_ospf.txt",
+            "data": gen.cisco_ospf_text(gen.ospf_specs(ospf_size), arista=True),
+            "size": ospf_size,
+        },
+        {
+            "table": BatfishOspfNeighborTable,
+            "file": "batfish_ospf.json",
+            "data": gen.batfish_ospf_json(gen.ospf_specs(ospf_size), BENCH_NODE),
+            "size": ospf_size,
+        },
+    ]
+
+
+def bench_parsers(work_dir: str, size: int, ecmp: int, ospf_size: int, repeat: int) -> List[Dict]:
+    """Benchmark each parser (table construction from a generated file)"""
+    results = []
+    for case in parser_cases(size, ecmp, ospf_size):
+        file_path = os.path.join(work_dir, case["file"])
+        gen.write_file(file_path, case["data"])
+
+        def _parse(table_class=case["table"], post=case.get("post"), path=file_path):
+            table = table_class(path)
+            if post:
+                post(table)
+            return table
+
+        measured = measure(_parse, repeat=repeat)
+        table = measured.pop("result")
+        name = case["table"].__name__ + (f" ({case['variant']})" if "variant" in case else "")
+        results.append(
+            {
+                "benchmark": "parse",
+                "name": name,
+                "size": case["size"],
+                "ecmp": ecmp,
+                "file_size": os.path.getsize(file_path),
+                "entries": len(table.entries),
+                **measured,
+            }
+        )
+        os.remove(file_path)
+    return results
+
+
+def bench_cross_check(work_dir: str, size: int, ecmp: int, repeat: int) -> Dict:
+    """Benchmark StateChecker.cross_check (juniper vs batfish tables, slightly different)"""
+    src_path = os.path.join(work_dir, "src_route.json")
+    dst_path = os.path.join(work_dir, "dst_route.json")
+    gen.write_file(src_path, gen.juniper_route_json(gen.route_specs(size, ecmp)))
+    gen.write_file(
+        dst_path, gen.batfish_route_json(gen.route_specs(size, ecmp, drop_rate=0.01, change_rate=0.01), BENCH_NODE)
+    )
+
+    def _setup():
+        src_table = JuniperRouteTable(src_path)
+        src_table.expand_rt_entry()
+        return src_table, BatfishRouteTable(dst_path)
+
+    measured = measure(lambda tables: StateChecker.cross_check(*tables), setup=_setup, repeat=repeat)
+    result = measured.pop("result")
+    os.remove(src_path)
+    os.remove(dst_path)
+    return {
+        "benchmark": "cross_check",
+        "name": "StateChecker.cross_check",
+        "size": size,
+        "ecmp": ecmp,
+        "entries": {k: len(v) for k, v in result.items()},
+        **measured,
+    }
+
+
+def _write_fleet(work_dir: str, nodes: int, size: int, ecmp: int) -> None:
+    config = FLEET_CONFIG.format(work_dir=work_dir)
+    for index in range(nodes):
+        node = f"rt{index}"
+        config += f"  - name: {node}\n    type: juniper\n    ospf: true\n"
+        specs = (("asis", "_show_route.txt", gen.juniper_route_json), ("bf", "_routes.json", None))
+        for snapshot, suffix, generator in specs:
+            route_dir = os.path.join(work_dir, "fleet", snapshot, "showroute")
+            os.makedirs(route_dir, exist_ok=True)
+            route_specs = gen.route_specs(size, ecmp, seed=index, drop_rate=0.01 if generator is None else 0.0)
+            data = generator(route_specs) if generator else gen.batfish_route_json(route_specs, node)
+            gen.write_file(os.path.join(route_dir, f"{node}{suffix}"), data)
+    with open(os.path.join(work_dir, "config.yaml"), "w", encoding="UTF-8") as file_io:
+        file_io.write(config)
+
+
+def bench_fleet(work_dir: str, nodes: int, size: int, ecmp: int) -> Dict:
+    """Benchmark all-nodes route check: memory for tables should not grow with number of nodes
+
+    Results are discarded as soon as each node is checked (as ndjson output), so peak_memory is the memory used
+    while checking a node (tables of the node and its result) and it should be flat for number of nodes.
+    """
+    _write_fleet(work_dir, nodes, size, ecmp)
+    # NOTICE: config file path is relative from current directory (template loader)
+    with chdir(work_dir):
+        checker = StateChecker("config.yaml", "original", "batfish", "fleet", "asis", "bf")
+        measured = measure(
+            lambda: deque(checker.iter_state_table_for_nodes("route", checker.config.original_node_params), maxlen=0),
+            repeat=1,
+        )
+    measured.pop("result")
+    return {
+        "benchmark": "fleet",
+        "name": "StateChecker.iter_state_table_for_nodes",
+        "nodes": nodes,
+        "size": size,
+        "ecmp": ecmp,
+        "working_memory": measured["peak_memory"] - measured["retained_memory"],
+        **measured,
+    }
+
+
+def check_fleet_memory(results: List[Dict], limit: float) -> List[str]:
+    """Errors if peak memory of all-nodes check grows with number of nodes (more than limit times the smallest)
+
+    Tables of a node are released after the node is checked, so peak memory should be flat for node counts.
+    """
+    fleet_results = sorted((r for r in results if r["benchmark"] == "fleet"), key=lambda r: r["nodes"])
+    if len(fleet_results) < 2:
+        return ["memory check requires 2 or more node counts (--nodes)"]
+    base = fleet_results[0]
+    return [
+        f"memory grows with nodes: {r['peak_memory']} bytes ({r['nodes']} nodes) > {limit} * "
+        f"{base['peak_memory']} bytes ({base['nodes']} nodes)"
+        for r in fleet_results[1:]
+        if r["peak_memory"] > limit * base["peak_memory"]
+    ]
+
+
+def import_time_total(importtime_log: str) -> Tuple[float, int]:
+    """Total import time [sec] and number of modules from `python -X importtime` log"""
+    total, modules = 0, 0
+    for line in importtime_log.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        total += int(line.split(":", 1)[1].split("|")[0])
+        modules += 1
+    return total / 1000000, modules
+
+
+def bench_startup(repeat: int) -> List[Dict]:
+    """Benchmark startup time of commands: wall time and import time (python -X importtime)"""
+    results = []
+    env = {**os.environ, "PYTHONPATH": os.path.join(REPO_DIR, "src")}
+    for command in STARTUP_COMMANDS:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", *command],
+                cwd=REPO_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            runs.append((time.perf_counter() - start, *import_time_total(proc.stderr), proc.returncode))
+        wall_time, import_time, modules, returncode = min(runs)
+        results.append(
+            {
+                "benchmark": "startup",
+                "name": " ".join(command),
+                "time": round(wall_time, 6),
+                "import_time": round(import_time, 6),
+                "modules": modules,
+                "returncode": returncode,
+            }
+        )
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the repository (if available)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def int_list(value: str) -> List[int]:
+    """Parse comma-separated integers"""
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> None:
+    """Run benchmarks and write results"""
+    parser = argparse.ArgumentParser(description="Benchmark parsers and cross-check with synthetic state data")
+    parser.add_argument("--sizes", type=int_list, default=[1000, 10000], help="Routes per table (comma-separated)")
+    parser.add_argument("--ecmp", type=int, default=1, help="ECMP width (next-hops per route)")
+    parser.add_argument("--ospf-size", type=int, default=1000, help="OSPF neighbors per table")
+    parser.add_argument("--nodes", type=int_list, default=[1, 4, 16], help="Node counts of fleet (comma-separated)")
+    parser.add_argument("--fleet-size", type=int, default=1000, help="Routes per node in fleet benchmark")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="Repeat count (minimum time is recorded)")
+    parser.add_argument("--output", "-o", type=str, help="Output JSON file (default: stdout)")
+    parser.add_argument(
+        "--check-memory",
+        type=float,
+        metavar="LIMIT",
+        help="Exit with error if peak memory of all-nodes check grows more than LIMIT times with nodes",
+    )
+    args = parser.parse_args()
+
+    print("# startup", file=sys.stderr)
+    results = bench_startup(args.repeat)
+    with tempfile.TemporaryDirectory(prefix="state_cross_checker_bench_") as tmp_dir:
+        for route_size in args.sizes:
+            print(f"# parse/cross-check: {route_size} routes", file=sys.stderr)
+            results.extend(bench_parsers(tmp_dir, route_size, args.ecmp, args.ospf_size, args.repeat))
+            results.append(bench_cross_check(tmp_dir, route_size, args.ecmp, args.repeat))
+        for node_count in args.nodes:
+            print(f"# fleet: {node_count} nodes", file=sys.stderr)
+            results.append(bench_fleet(tmp_dir, node_count, args.fleet_size, args.ecmp))
+
+    output_data = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "params": vars(args),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as output_file:
+            json.dump(output_data, output_file, indent=2)
+    else:
+        print(json.dumps(output_data, indent=2))
+
+    if args.check_memory is not None:
+        errors = check_fleet_memory(results, args.check_memory)
+        for error in errors:
+            print(f"ERROR: {error}", file=sys.stderr)
+        if errors:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,30 +2,58 @@ import argparse
 import os
 import re
 import sys
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List
 import yaml
-from jinja2 import Environment, FileSystemLoader
-from pybatfish.client.session import Session
-import pandas as pd
 
+# NOTICE: heavy dependencies (pybatfish, pandas and jinja2) are imported when they are used
+# (not to load them for --help, etc.)
+if TYPE_CHECKING:
+    from pybatfish.client.session import Session
+    import pandas as pd
 
-def bfq_node_list(bf_session: Session) -> List[str]:
+
+def bfq_node_list(bf_session: "Session") -> List[str]:
     """Node list"""
     data_frame = bf_session.q.nodeProperties(properties="Configuration_Format").answer().frame()
     return data_frame["Node"].values.tolist()
 
 
-def bfq_routes_df(bf_session: Session, node: str) -> pd.DataFrame:
+def bfq_routes_df(bf_session: "Session", node: str) -> "pd.DataFrame":
     """Route entries of the node"""
     return bf_session.q.routes(nodes=node).answer().frame()
 
 
-def bfq_ospf_session_df(bf_session: Session, node: str) -> pd.DataFrame:
+def bfq_ospf_session_df(bf_session: "Session", node: str) -> "pd.DataFrame":
     """Ospf neighbors of the node"""
     return bf_session.q.ospfSessionCompatibility(nodes=node).answer().frame()
 
 
-def save_df_as_json(bf_session: pd.DataFrame, directory: str, file: str) -> None:
+def bfq_all_routes_df(bf_session: "Session") -> "pd.DataFrame":
+    """Route entries of all nodes"""
+    return bf_session.q.routes().answer().frame()
+
+
+def bfq_all_ospf_session_df(bf_session: "Session") -> "pd.DataFrame":
+    """Ospf neighbors of all nodes"""
+    return bf_session.q.ospfSessionCompatibility().answer().frame()
+
+
+def split_df_by_node(
+    data_frame: "pd.DataFrame", row_nodes: "pd.Series", nodes: List[str]
+) -> Dict[str, "pd.DataFrame"]:
+    """Split query result of all nodes (dataframe) to dataframes for each node
+
+    row_nodes is node name of each row of the dataframe (case of node name is ignored)
+    """
+    node_dfs = {}
+    if len(data_frame) > 0:
+        node_dfs = dict(tuple(data_frame.groupby(row_nodes.map(str.lower), sort=False)))
+    # node that has no entry: empty dataframe (same columns)
+    return {node: node_dfs.get(node.lower(), data_frame.iloc[0:0]) for node in nodes}
+
+
+def save_df_as_json(bf_session: "pd.DataFrame", directory: str, file: str) -> None:
     """Save query result (dataframe) to file as the csv file"""
     directory = os.path.expanduser(directory)
     os.makedirs(directory, exist_ok=True)
@@ -34,25 +62,60 @@ def save_df_as_json(bf_session: pd.DataFrame, directory: str, file: str) -> None
         csv_file.write(bf_session.to_json(orient="records"))
 
 
-def exec_queries(bf_config: Dict) -> None:
-    """Query questions to batfish"""
-    bf_session = Session(bf_config["bf_host"])
-    bf_session.set_network(bf_config["bf_nw_name"])
-    bf_session.init_snapshot(os.path.expanduser(bf_config["bf_dir"]), name=bf_config["bf_ss_name"], overwrite=True)
-    bf_session.set_snapshot(bf_config["bf_ss_name"])
-    for node in bfq_node_list(bf_session):
-        # ignore segment node (ex: "seg-192.168.0.0-24")
-        if re.match(r"seg-(\d+.){3}\d+-\d+", node):
-            continue
+def target_nodes(bf_session: "Session") -> List[str]:
+    """Node list without segment node"""
+    # ignore segment node (ex: "seg-192.168.0.0-24")
+    return [node for node in bfq_node_list(bf_session) if not re.match(r"seg-(\d+.){3}\d+-\d+", node)]
+
 
+def query_node_by_node(bf_session: "Session", bf_config: Dict, nodes: List[str], jobs=1) -> None:
+    """Query questions for each node (concurrently with thread pool if jobs > 1)"""
+
+    def _query(node: str) -> Dict[str, "pd.DataFrame"]:
+        return {
+            bf_config["ospf_routes_file"]: bfq_routes_df(bf_session, node),
+            bf_config["ospf_neighbors_file"]: bfq_ospf_session_df(bf_session, node),
+        }
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        # save files in order of node list
+        for node, node_dfs in zip(nodes, executor.map(_query, nodes)):
+            print(f"* Node: {node}")
+            output_dir = os.path.join(bf_config["state_dir"], node)
+            for file, data_frame in node_dfs.items():
+                save_df_as_json(data_frame, output_dir, file)
+
+
+def query_all_nodes(bf_session: "Session", bf_config: Dict, nodes: List[str]) -> None:
+    """Query questions once for all nodes and split their results for each node"""
+    routes_df = bfq_all_routes_df(bf_session)
+    routes_dfs = split_df_by_node(routes_df, routes_df["Node"], nodes)
+    neighbors_df = bfq_all_ospf_session_df(bf_session)
+    neighbors_dfs = split_df_by_node(neighbors_df, neighbors_df["Interface"].map(lambda i: i.hostname), nodes)
+    for node in nodes:
         print(f"* Node: {node}")
         output_dir = os.path.join(bf_config["state_dir"], node)
         # routing table state
-        routes_df = bfq_routes_df(bf_session, node)
-        save_df_as_json(routes_df, output_dir, bf_config["ospf_routes_file"])
+        save_df_as_json(routes_dfs[node], output_dir, bf_config["ospf_routes_file"])
         # neighbors table state
-        neighbors_df = bfq_ospf_session_df(bf_session, node)
-        save_df_as_json(neighbors_df, output_dir, bf_config["ospf_neighbors_file"])
+        save_df_as_json(neighbors_dfs[node], output_dir, bf_config["ospf_neighbors_file"])
+
+
+def exec_queries(bf_config: Dict, bulk=True, jobs=1, bf_session=None) -> None:
+    """Query questions to batfish"""
+    if bf_session is None:
+        from pybatfish.client.session import Session  # pylint: disable=import-outside-toplevel
+
+        bf_session = Session(bf_config["bf_host"])
+    bf_session.set_network(bf_config["bf_nw_name"])
+    bf_session.init_snapshot(os.path.expanduser(bf_config["bf_dir"]), name=bf_config["bf_ss_name"], overwrite=True)
+    bf_session.set_snapshot(bf_config["bf_ss_name"])
+
+    nodes = target_nodes(bf_session)
+    if bulk:
+        query_all_nodes(bf_session, bf_config, nodes)
+    else:
+        query_node_by_node(bf_session, bf_config, nodes, jobs)
 
 
 if __name__ == "__main__":
@@ -60,6 +123,8 @@ if __name__ == "__main__":
     parser.add_argument("--config", "-c", type=str, default="config.tmpl.yaml", help="Config file")
     parser.add_argument("--network", "-n", type=str, required=True, help="Target network name")
     parser.add_argument("--snapshot", "-s", type=str, required=True, help="Target snapshot name")
+    parser.add_argument("--per-node", action="store_true", help="Query questions node by node (not in bulk)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of concurrent queries (with --per-node)")
     args = parser.parse_args()
 
     if not args.config:
@@ -67,6 +132,8 @@ if __name__ == "__main__":
         sys.exit(1)
 
     # load config (config template)
+    from jinja2 import Environment, FileSystemLoader  # pylint: disable=import-outside-toplevel
+
     env = Environment(loader=FileSystemLoader("./", encoding="utf8"))
     template = env.get_template(args.config)
     template_param = {"network_name": args.network, "snapshot_name": args.snapshot}
@@ -74,4 +141,4 @@ if __name__ == "__main__":
     config_string = template.render(template_param)
     config_data = yaml.safe_load(config_string)
     # exec queries
-    exec_queries(config_data["batfish"])
+    exec_queries(config_data["batfish"], bulk=not args.per_node, jobs=args.jobs)
@@ -0,0 +1,35 @@
+# NOTICE: export PYTHONPATH="./src"
+import argparse
+from typing import Tuple
+from src.cli_common import ENV_CHOICES, add_common_arguments, checker_options, profiling, run_check
+from src.state_matrix_checker import StateMatrixChecker
+
+
+def env_snapshot(value: str) -> Tuple[str, str]:
+    """Parse snapshot argument: "env:snapshot" """
+    env, sep, snapshot = value.partition(":")
+    if not sep or not snapshot:
+        raise argparse.ArgumentTypeError(f"snapshot must be env:snapshot: {value}")
+    if env not in ENV_CHOICES:
+        raise argparse.ArgumentTypeError(f"unknown env {env} (choose from {ENV_CHOICES})")
+    return env, snapshot
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross check state tables among every pair of snapshots")
+    add_common_arguments(parser)
+    # target snapshots
+    parser.add_argument(
+        "--snapshot",
+        "-s",
+        required=True,
+        action="append",
+        type=env_snapshot,
+        help="Target snapshot as env:snapshot (specify 2 or more times)",
+    )
+
+    args = parser.parse_args()
+    with profiling(args):
+        state_checker = StateMatrixChecker(args.config, args.network, args.snapshot, **checker_options(args))
+        output_header = {"snapshots": [{"env": env, "snapshot": ss} for env, ss in args.snapshot]}
+        run_check(args, state_checker, output_header)
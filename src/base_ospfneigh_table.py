@@ -1,12 +1,23 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from interface_name import interface_key
 from state_table import StateTableEntry, StateTable
 import utility as util
 
+# attributes to choose one from entries that have same address (in order of priority)
+MATCH_ATTRIBUTES = [("interface_key", "id"), ("interface_key",), ("id",)]
+
 
 class OspfNeighborTableEntry(StateTableEntry):
+    __slots__ = ("address", "interface", "interface_key", "state", "id", "priority")
+
+    # format of interface names (vendor of interface_key)
+    VENDOR = "_undefined_"
+
     def __init__(self):
+        super().__init__()
         self.address: str = "_undefined_"  # IP address
         self.interface: str = "_undefined_"
+        self.interface_key: str = "_undefined_"  # canonical key of interface name to compare interfaces
         self.state: str = "_undefined_"
         # pylint: disable=invalid-name
         self.id: str = "_undefined_"  # IP address (router-id)
@@ -21,6 +32,17 @@ class OspfNeighborTableEntry(StateTableEntry):
             "priority": self.priority,
         }
 
+    def set_interface(self, interface: str) -> None:
+        """Set interface name and its canonical key"""
+        self.interface = util.intern_str(interface)
+        self.interface_key = interface_key(self.interface, self.VENDOR)
+
+    def canonical(self) -> Tuple:
+        return self.address, self.interface, self.state, self.id, self.priority
+
+    def fields(self) -> Dict[str, Any]:
+        return self.to_dict()
+
 
 class OspfNeighborTable(StateTable):
     def __init__(self, debug=False):
@@ -28,9 +50,25 @@ class OspfNeighborTable(StateTable):
         self.table_name = "_ospf_neighbor_"
         self.entries: List[OspfNeighborTableEntry] = []
 
+    @staticmethod
+    def _index_key(entry: OspfNeighborTableEntry) -> str:
+        return entry.address
+
+    @staticmethod
+    def _match_keys(entry: OspfNeighborTableEntry) -> Iterator[Tuple]:
+        # NOTICE: undefined attribute is a wildcard (keys that have it are skipped)
+        for attributes in MATCH_ATTRIBUTES:
+            values = tuple(getattr(entry, a) for a in attributes)
+            if "_undefined_" not in values:
+                yield entry.address, attributes, values
+
+    @staticmethod
+    def _secondary_keys(entry: OspfNeighborTableEntry) -> Iterator[Tuple]:
+        return OspfNeighborTable._match_keys(entry)
+
     def find_all_entries_by_address(self, address: str) -> List[OspfNeighborTableEntry]:
         """Find all entries that matches given address"""
-        return [e for e in self.entries if e.address == address]
+        return self._find_all_entries_by_key(address)
 
     # pylint: disable=arguments-renamed
     def find_entry_equiv(self, ospfneigh_entry: OspfNeighborTableEntry) -> Optional[OspfNeighborTableEntry]:
@@ -38,7 +76,11 @@ class OspfNeighborTable(StateTable):
         if len(candidate_entries) == 0:
             return None
         if len(candidate_entries) > 1:
-            # TODO: other attribute matching
-            util.warn(f"Found multiple candidate ospf-neighbor-entries: #{candidate_entries}")
+            # 1st candidate that matches attributes in order of MATCH_ATTRIBUTES
+            for key in self._match_keys(ospfneigh_entry):
+                entry = self._find_first_entry_by_keys([key])
+                if entry is not None:
+                    return entry
+            util.debug(f"No attribute matched in ospf-neighbor-entries: {ospfneigh_entry.address}", self.debug)
 
         return candidate_entries[0]
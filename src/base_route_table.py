@@ -1,13 +1,27 @@
-import re
-from typing import Dict, List, Optional
+import copy
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+from interface_name import interface_key
+from ip_prefix import PrefixIndex, parse_address, parse_prefix
 from state_table import StateTableEntry, StateTable
+import utility as util
 
 
 class RouteEntryNextHop:
+    __slots__ = ("to", "via", "via_key")
+
+    # format of interface names (vendor of interface_key)
+    VENDOR = "_undefined_"
+
     def __init__(self):
         # pylint: disable=invalid-name
         self.to: str = "_undefined_"  # IP address ("a.b.c.d")
         self.via: str = "_undefined_"
+        self.via_key: str = "_undefined_"  # canonical key of via (interface name) to compare interfaces
+
+    def set_via(self, via: str) -> None:
+        """Set interface name (via) and its canonical key"""
+        self.via = util.intern_str(via)
+        self.via_key = interface_key(self.via, self.VENDOR)
 
     def to_dict(self) -> Dict:
         """Convert self to dict"""
@@ -15,6 +29,8 @@ class RouteEntryNextHop:
 
 
 class RouteEntry:
+    __slots__ = ("nexthops", "nexthop_type", "preference", "protocol", "metric")
+
     def __init__(self):
         self.nexthops: List[RouteEntryNextHop] = []
         self.nexthop_type: str = "_undefined_"
@@ -32,15 +48,59 @@ class RouteEntry:
             "metric": self.metric,
         }
 
+    def canonical(self) -> Tuple:
+        """Canonical form (tuple of all attributes) of self"""
+        return (
+            tuple((n.to, n.via) for n in self.nexthops),
+            self.nexthop_type,
+            self.preference,
+            self.protocol,
+            self.metric,
+        )
+
+    def copy_with_nexthops(self, nexthops: List[RouteEntryNextHop]) -> "RouteEntry":
+        """Shallow copy of self that has given nexthops (other attributes are shared with self)"""
+        route_entry = copy.copy(self)
+        route_entry.nexthops = nexthops
+        return route_entry
+
 
 class RouteTableEntry(StateTableEntry):
+    __slots__ = ("destination", "prefix", "entries")
+
     def __init__(self):
+        super().__init__()
         self.destination: str = "_undefined_"  # IP address + prefix-length ("a.b.c.d/nn")
+        self.prefix: Optional[int] = None  # packed prefix of destination (None if it is not IPv4 prefix)
         self.entries: List[RouteEntry] = []
 
+    def set_destination(self, destination: str) -> None:
+        """Set destination and its packed prefix"""
+        self.destination = destination
+        self.prefix = parse_prefix(destination)
+
     def to_dict(self) -> Dict:
         return {"destination": self.destination, "entries": [e.to_dict() for e in self.entries]}
 
+    def canonical(self) -> Tuple:
+        return self.destination, tuple(e.canonical() for e in self.entries)
+
+    def fields(self) -> Dict[str, Any]:
+        # fields of 1st route entry are not prefixed (an expanded entry has only 1 route entry)
+        fields = {"destination": self.destination}
+        for index, entry in enumerate(self.entries):
+            if index == 0:
+                fields.update(entry.to_dict())
+                continue
+            fields.update({f"entries[{index}].{name}": value for name, value in entry.to_dict().items()})
+        return fields
+
+    def copy_with_entries(self, entries: List[RouteEntry]) -> "RouteTableEntry":
+        """Shallow copy of self that has given route entries (other attributes are shared with self)"""
+        rt_entry = self.shallow_copy()
+        rt_entry.entries = entries
+        return rt_entry
+
 
 class RouteTable(StateTable):
     def __init__(self, debug=False):
@@ -48,29 +108,81 @@ class RouteTable(StateTable):
         self.table_name = "_undefined_"
         self.entries: List[RouteTableEntry] = []
 
+    @staticmethod
+    def _destination_key(destination: str) -> Hashable:
+        # NOTICE: destinations are compared as packed prefix ("010.0.0.0/8" is same as "10.0.0.0/8")
+        prefix = parse_prefix(destination)
+        return destination if prefix is None else prefix
+
+    @staticmethod
+    def _index_key(entry: RouteTableEntry) -> Hashable:
+        return entry.destination if entry.prefix is None else entry.prefix
+
+    def entry_key(self, entry: RouteTableEntry) -> str:
+        return entry.destination
+
+    @staticmethod
+    def _first_nexthop(entry: RouteTableEntry) -> Optional[Dict]:
+        # all route-table entries must be expanded (only 1 entry, 1 nexthop)
+        if len(entry.entries) > 0 and len(entry.entries[0].nexthops) > 0:
+            return entry.entries[0].nexthops[0].to_dict()
+        return None
+
+    def changed_record(self, src_entry: RouteTableEntry, dst_entry: RouteTableEntry, diff: Dict) -> Dict:
+        # NOTICE: ECMP routes have same destination: matched nexthops distinguish records of them
+        record = super().changed_record(src_entry, dst_entry, diff)
+        record["nexthop"] = {"src": self._first_nexthop(src_entry), "dst": self._first_nexthop(dst_entry)}
+        return record
+
+    @staticmethod
+    def _nexthop_keys(key: Hashable, nexthop: RouteEntryNextHop) -> List[Tuple]:
+        return [("to", key, nexthop.to), ("via", key, nexthop.via_key)]
+
+    @staticmethod
+    def _secondary_keys(entry: RouteTableEntry) -> Iterator[Hashable]:
+        # all route-table entries must be expanded (only 1 entry, 1 nexthop)
+        if len(entry.entries) > 0 and len(entry.entries[0].nexthops) > 0:
+            yield from RouteTable._nexthop_keys(RouteTable._index_key(entry), entry.entries[0].nexthops[0])
+
     def find_all_entries_by_destination(self, destination: str) -> List[RouteTableEntry]:
         """Find all entries that matches given destination"""
-        return [e for e in self.entries if e.destination == destination]
+        return self._find_all_entries_by_key(self._destination_key(destination))
 
     # pylint: disable=arguments-renamed
     def find_entry_equiv(self, rt_entry: RouteTableEntry) -> Optional[RouteTableEntry]:
-        candidate_entries = self.find_all_entries_by_destination(rt_entry.destination)
+        key = self._index_key(rt_entry)
+        candidate_entries = self._find_all_entries_by_key(key)
         if len(candidate_entries) == 0:
             return None
 
-        if len(candidate_entries) > 1:
-            # all route-table entries must be expanded (only 1 entry, 1 nexthop)
-            for entry in candidate_entries:
-                if not (len(entry.entries) > 0 and len(rt_entry.entries) > 0):
-                    continue
-
-                self_nh = entry.entries[0].nexthops[0]  # alias
-                other_nh = rt_entry.entries[0].nexthops[0]  # alias
-                if self_nh.to == other_nh.to or self_nh.via in [
-                    other_nh.via,
-                    other_nh.via + ".0",
-                    re.sub(r"\.\d+$", "", other_nh.via),
-                ]:
-                    return entry
+        if len(candidate_entries) > 1 and len(rt_entry.entries) > 0 and len(rt_entry.entries[0].nexthops) > 0:
+            # 1st candidate that has same nexthop address or interface
+            other_nh = rt_entry.entries[0].nexthops[0]  # alias
+            entry = self._find_first_entry_by_keys(self._nexthop_keys(key, other_nh))
+            if entry is not None:
+                return entry
 
         return candidate_entries[0]
+
+    def prefix_index(self) -> PrefixIndex[RouteTableEntry]:
+        """Index of entries by prefix (entries that have IPv4 destination)"""
+        return self._derived(
+            "prefix_index", lambda: PrefixIndex((e.prefix, e) for e in self.entries if e.prefix is not None)
+        )
+
+    def find_longest_match_entries(self, address: str) -> List[RouteTableEntry]:
+        """Find all entries of the longest prefix that contains given address ("a.b.c.d")"""
+        address_value = parse_address(address)
+        if address_value is None:
+            return []
+        prefix_index = self.prefix_index()
+        prefix = prefix_index.longest_match(address_value)
+        return [] if prefix is None else prefix_index.exact_match(prefix)
+
+    def find_covered_entries(self, destination: str) -> List[RouteTableEntry]:
+        """Find all entries whose destination is contained in given destination (include itself)"""
+        prefix = parse_prefix(destination)
+        if prefix is None:
+            return self.find_all_entries_by_destination(destination)
+        prefix_index = self.prefix_index()
+        return [e for p in prefix_index.covered_prefixes(prefix) for e in prefix_index.exact_match(p)]
@@ -1,13 +1,20 @@
 from typing import Dict
 from base_ospfneigh_table import OspfNeighborTable, OspfNeighborTableEntry
+from interface_name import interface_key
+import utility as util
 
 
 class BatfishOspfNeighborTableEntry(OspfNeighborTableEntry):
+    __slots__ = ()
+    VENDOR = "batfish"
+
     def __init__(self, neighbor_data: Dict):
         super().__init__()
         self.address = neighbor_data["Remote_IP"]
-        self.interface = neighbor_data["Remote_Interface"]["hostname"]
-        self.state = neighbor_data["Session_Status"]
+        self.interface = util.intern_str(neighbor_data["Remote_Interface"]["hostname"])
+        # NOTICE: key to match entries by interface is of local interface (sessions are split by Interface.hostname)
+        self.interface_key = interface_key(neighbor_data["Interface"]["interface"], self.VENDOR)
+        self.state = util.intern_str(neighbor_data["Session_Status"])
         # self.id
         # self.priority
 
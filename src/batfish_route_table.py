@@ -1,41 +1,62 @@
-from typing import Dict, List
+import os
+from typing import Dict, List, Optional
 from base_route_table import RouteEntryNextHop, RouteEntry, RouteTableEntry, RouteTable
+from json_stream import JsonCursor
+import utility as util
 
 
 class BatfishRouteEntryNextHop(RouteEntryNextHop):
+    __slots__ = ()
+    VENDOR = "batfish"
+
     def __init__(self, rt_data: Dict):
         super().__init__()
-        self.to = rt_data["Next_Hop_IP"]
-        self.via = rt_data["Next_Hop_Interface"]
+        self.to = util.intern_str(rt_data["Next_Hop_IP"])
+        self.set_via(rt_data["Next_Hop_Interface"])
 
 
 class BatfishRouteEntry(RouteEntry):
+    __slots__ = ()
+
     def __init__(self, rt_data: Dict):
         super().__init__()
         self.nexthops = [BatfishRouteEntryNextHop(rt_data)]
         if "type" in rt_data["Next_Hop"]:
-            self.nexthop_type = rt_data["Next_Hop"]["type"]
+            self.nexthop_type = util.intern_str(rt_data["Next_Hop"]["type"])
         self.preference = rt_data["Admin_Distance"]
-        self.protocol = rt_data["Protocol"]
+        self.protocol = util.intern_str(rt_data["Protocol"])
         self.metric = rt_data["Metric"]
 
 
 class BatfishRouteTableEntry(RouteTableEntry):
+    __slots__ = ()
+
     def __init__(self, rt_data: Dict):
         super().__init__()
         # _debug(f"bf rt_data: {json.dumps(rt_data)}")
 
-        self.destination = rt_data["Network"]
+        self.set_destination(rt_data["Network"])
         self.entries: List[BatfishRouteEntry] = [BatfishRouteEntry(rt_data)]
 
 
 class BatfishRouteTable(RouteTable):
-    def __init__(self, file: str, debug=False):
+    HAS_RAW_DATA = True
+    # NOTICE: raw data is None if not kept (e.g. table restored from table cache)
+    data: Optional[List[Dict]] = None
+
+    def __init__(self, file: str, debug=False, keep_raw=False):
         super().__init__(debug)
-        self.data = self._read_json_file(file)
+        # raw data (list of routes): kept only if keep_raw (for debug)
+        self.data: Optional[List[Dict]] = [] if keep_raw else None
 
         # find default entries of default vrf
         self.table_name = "default"
-        self.entries: List[BatfishRouteTableEntry] = [
-            BatfishRouteTableEntry(e) for e in self.data if e["VRF"] == self.table_name
-        ]
+        # NOTICE: read routes one by one (not to keep whole raw data)
+        with open(os.path.expanduser(file), "r", encoding="UTF-8") as file_io:
+            cursor = JsonCursor(file_io)
+            for _ in cursor.iter_array():
+                rt_data = cursor.decode()
+                if self.data is not None:
+                    self.data.append(rt_data)
+                if rt_data["VRF"] == self.table_name:
+                    self.entries.append(BatfishRouteTableEntry(rt_data))
@@ -1,39 +1,34 @@
 import os
-import re
 from typing import Dict, List, NoReturn
 import yaml
 from base_ospfneigh_table import OspfNeighborTable, OspfNeighborTableEntry
-from parseable import Parseable
+from parseable import LineSource, Parseable
 import utility as util
 
 
 class CiscoOspfNeighborTableEntry(OspfNeighborTableEntry):
+    __slots__ = ()
+    VENDOR = "cisco"
+
     def __init__(self, neighbor_data: Dict):
         super().__init__()
 
         self.address = neighbor_data["addr"]
-        self.interface = neighbor_data["intf"]
-        self.state = neighbor_data["state"]
+        self.set_interface(neighbor_data["intf"])
+        self.state = util.intern_str(neighbor_data["state"])
         self.id = neighbor_data["id"]
         self.priority = int(neighbor_data["priority"])
 
 
 class CiscoOspfNeighborTable(OspfNeighborTable, Parseable):
-    def __init__(self, file_path: str, debug=False):
+    def __init__(self, source: LineSource, debug=False):
         super().__init__(debug)
 
         self.table_name = "_cisco_ospf_neighbor_"
-        self._load_table_data(file_path)
-
-    # pylint: disable=duplicate-code
-    def _load_table_data(self, file_path: str) -> NoReturn:
-        with open(file_path, encoding="UTF-8") as file_io:
-            index = 0
-            for line in file_io.read().splitlines():
-                index += 1
-                util.debug(f"{index}: LINE={line}", self.debug)
+        self._load_table_data(source)
 
-                self._match_line(index, line, self.debug)
+    def _load_table_data(self, source: LineSource) -> NoReturn:
+        self._parse_lines(source, self.debug)
 
     @staticmethod
     def _generate_match_info_list() -> List[Dict]:
@@ -57,16 +52,15 @@ class CiscoOspfNeighborTable(OspfNeighborTable, Parseable):
             },
         ]
 
-    def _add_entry_by_type(self, match: re.Match, _match_info: Dict) -> NoReturn:
-        mdict = match.groupdict()
-
+    def _add_entry_by_type(self, mdict: Dict, _match_info: Dict) -> NoReturn:
         neighbor_id = mdict["id"]
         priority = mdict["priority"]
         state = mdict["state"]
         addr = mdict["addr"]
         intf = mdict["intf"]
 
-        util.debug(f"{neighbor_id}, {priority}, {state}, {addr}, {intf}", self.debug)
+        if self.debug:
+            util.debug(f"{neighbor_id}, {priority}, {state}, {addr}, {intf}", self.debug)
 
         self.entries.append(CiscoOspfNeighborTableEntry(mdict))
 
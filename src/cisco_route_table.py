@@ -3,21 +3,26 @@ import re
 from typing import Dict, List, NoReturn
 import yaml
 from base_route_table import RouteEntryNextHop, RouteEntry, RouteTableEntry, RouteTable
-from parseable import Parseable
+from parseable import LineSource, Parseable
 import utility as util
 
 
 class CiscoRouteEntryNextHop(RouteEntryNextHop):
+    __slots__ = ()
+    VENDOR = "cisco"
+
     def __init__(self, rt_nh: Dict):
         super().__init__()
 
         if "to" in rt_nh:
-            self.to = rt_nh["to"]
+            self.to = util.intern_str(rt_nh["to"])
         if "via" in rt_nh:
-            self.via = rt_nh["via"]
+            self.set_via(rt_nh["via"])
 
 
 class CiscoRouteEntry(RouteEntry):
+    __slots__ = ()
+
     def __init__(self, rt_entry: Dict):
         super().__init__()
 
@@ -28,48 +33,53 @@ class CiscoRouteEntry(RouteEntry):
         if "metric" in rt_entry:
             self.metric = int(rt_entry["metric"])
         if "protocol" in rt_entry:
-            self.protocol = rt_entry["protocol"]
+            self.protocol = util.intern_str(rt_entry["protocol"])
 
 
 class CiscoRouteTableEntry(RouteTableEntry):
+    __slots__ = ()
+
     def __init__(self, rt_data: Dict):
         super().__init__()
 
-        self.destination = rt_data["rt-destination"]
+        self.set_destination(rt_data["rt-destination"])
         self.entries: List[CiscoRouteEntry] = [CiscoRouteEntry(r) for r in rt_data["rt-entry"]]
 
 
 class CiscoRouteTable(RouteTable, Parseable):
     LONG_PROTO_TABLE = {"C": "Direct", "L": "Local", "S": "Static", "O": "OSPF", "B": "BGP"}
+    VRF_REGEXP = re.compile(r"VRF: (?P<table_name>.+)")
 
-    def __init__(self, file_path: str, debug=False):
+    def __init__(self, source: LineSource, debug=False):
         super().__init__(debug)
 
-        self._load_table_data(file_path)
+        self._load_table_data(source)
 
-    # pylint: disable=duplicate-code
-    def _load_table_data(self, file_path: str) -> NoReturn:
-        with open(file_path, encoding="UTF-8") as file_io:
-            index = 0
-            for line in file_io.read().splitlines():
-                index += 1
-                util.debug(f"{index}: LINE={line}", self.debug)
+    def _load_table_data(self, source: LineSource) -> NoReturn:
+        self._parse_lines(source, self.debug)
 
-                # there are several differences between cisco/arista show route format
-                # - entry lean time
-                # - protocol types
+    def _parse_line(self, index: int, line: str, debug=False) -> bool:
+        # there are several differences between cisco/arista show route format
+        # - entry lean time
+        # - protocol types
 
-                if self._match_line(index, line, self.debug):
-                    continue
+        if self._match_line(index, line, debug):
+            return True
 
-                # VRF name (routing table name)
-                match = re.search(r"VRF: (?P<table_name>.+)", line)
-                if match:
-                    self.table_name = match.group("table_name")
+        # VRF name (routing table name)
+        match = self.VRF_REGEXP.search(line)
+        if match:
+            self.table_name = match.group("table_name")
+            return True
+        return False
 
     @staticmethod
     def _generate_match_info_list() -> List[Dict]:
         proto_re = r"(?P<proto>[CLSOB])"  # connected, local, static, ospf, bgp
+        # rest of protocol code (like "O IA", "O*E2") until prefix; not captured
+        # at least 2 chars ending with whitespace (as `.+\s+`), e.g. "O 10.0.0.0/8" (single space) is not matched
+        # NOTICE: match token-by-token to avoid heavy backtracking in lines that does not match
+        gap_re = r".\S*\s+(?:\S+\s+)*?"
         prefix_re = r"(?P<prefix>(?:\d+\.){3}\d+\/\d+)"  # x.x.x.x/xx
         pm_re = r"\[(?P<preference>\d+)\/(?P<metric>\d+)\]"  # preference(admin-distance) and metric
         ip_re = r"(?P<ip>(?:\d+\.){3}\d+)"  # x.x.x.x
@@ -77,8 +87,8 @@ class CiscoRouteTable(RouteTable, Parseable):
         intf_re = r"(?P<intf>[\w\d\/:_]+)"  # NOTICE: difficult to discriminate between time_re and intf_re
 
         base_re_list = [
-            {"regexp": rf"{proto_re}.+\s+{prefix_re} is directly connected", "type": "direct"},
-            {"regexp": rf"{proto_re}.+\s+{prefix_re} {pm_re} via {ip_re}", "type": "entry"},
+            {"regexp": rf"{proto_re}{gap_re}{prefix_re} is directly connected", "type": "direct", "keyword": " is "},
+            {"regexp": rf"{proto_re}{gap_re}{prefix_re} {pm_re} via {ip_re}", "type": "entry", "keyword": "] via "},
             {"regexp": rf"^\s*via {ip_re}", "type": "entry_repeat"},
         ]
         # NOTICE: order of suffix check; must both -> time only -> intf only
@@ -88,30 +98,30 @@ class CiscoRouteTable(RouteTable, Parseable):
         # direct product of base_re_list and suffix_re_list
         match_info_list = []
         for base_re in base_re_list:
+            # NOTICE: base regexp is atomic (lookahead and back reference) not to backtrack into it
+            # when its suffix is unmatched
+            atomic_base_re = rf"(?=(?P<_base>{base_re['regexp']}))(?P=_base)"
             for suffix_re in suffix_re_list:
-                match_info_list.append(
-                    {
-                        "regexp": rf"{base_re['regexp']}, {suffix_re}",
-                        "type": base_re["type"],
-                    }
-                )
+                # keep type and keyword (if exists) of the base
+                match_info_list.append({**base_re, "regexp": rf"{atomic_base_re}, {suffix_re}"})
 
         return match_info_list
 
-    def _add_entry_by_type(self, match: re.Match, match_info: Dict) -> NoReturn:
+    def _add_entry_by_type(self, mdict: Dict, match_info: Dict) -> NoReturn:
         if match_info["type"] == "direct":
-            self._add_direct_entry(match.groupdict())
+            self._add_direct_entry(mdict)
         elif match_info["type"] == "entry":
-            self._add_entry(match.groupdict())
+            self._add_entry(mdict)
         elif match_info["type"] == "entry_repeat":
-            self._add_nexthop_to_before_entry(match.groupdict())
+            self._add_nexthop_to_before_entry(mdict)
 
     def _add_direct_entry(self, mdict: Dict) -> NoReturn:
         proto = self._long_proto(mdict["proto"])
         prefix = mdict["prefix"]
         intf = mdict["intf"] if "intf" in mdict else None
 
-        util.debug(f"entry (direct) : proto={proto} prefix={prefix}, intf={intf}", self.debug)
+        if self.debug:
+            util.debug(f"entry (direct) : proto={proto} prefix={prefix}, intf={intf}", self.debug)
 
         rt_entry = {"protocol": proto, "preference": 0}
         if intf is not None:
@@ -127,10 +137,11 @@ class CiscoRouteTable(RouteTable, Parseable):
         via_ip = mdict["ip"]
         via_intf = mdict["intf"] if "intf" in mdict else None
 
-        util.debug(
-            f"entry : proto={proto}, [{preference}/{metric}] prefix={prefix}, ip={via_ip}, intf={via_intf}",
-            self.debug,
-        )
+        if self.debug:
+            util.debug(
+                f"entry : proto={proto}, [{preference}/{metric}] prefix={prefix}, ip={via_ip}, intf={via_intf}",
+                self.debug,
+            )
 
         rt_entry = {"protocol": proto, "preference": preference, "metric": metric}
         if via_intf is not None:
@@ -144,7 +155,8 @@ class CiscoRouteTable(RouteTable, Parseable):
         via_ip = mdict["ip"]
         via_intf = mdict["intf"] if "intf" in mdict else None
 
-        util.debug(f"match entry (same dst): ip={via_ip}, intf={via_intf}", self.debug)
+        if self.debug:
+            util.debug(f"match entry (same dst): ip={via_ip}, intf={via_intf}", self.debug)
 
         rt_entry: CiscoRouteTableEntry = self.entries[-1]
         if via_intf is not None:
@@ -0,0 +1,110 @@
+import argparse
+import cProfile
+import json
+from contextlib import contextmanager
+from typing import Dict, Iterator
+from forwarding_check import read_probes
+from phase_timer import PhaseTimer
+from result_output import OUTPUT_FORMATS, write_results
+from state_checker import BACKENDS, StateChecker, target_tables
+from table_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE, TableCache
+import utility as util
+
+# common part of command line tools (diff_state.py and diff_state_matrix.py)
+ENV_CHOICES = ["batfish", "original", "emulated"]
+
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add options common to command line tools (options except target snapshots)"""
+    parser.add_argument("--config", "-c", type=str, help="Config file")
+    parser.add_argument(
+        "--table",
+        "-t",
+        required=True,
+        type=target_tables,
+        help="Target state table(s): comma-separated [route,ospf_neighbor,forwarding] or all",
+    )
+    parser.add_argument("--debug", action="store_true", help="raw data to debug")
+    parser.add_argument(
+        "--output", "-o", choices=OUTPUT_FORMATS, default="yaml", help="Output format (ndjson: a line for each node)"
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of nodes checked in parallel")
+    parser.add_argument("--no-cache", action="store_true", help="Parse state files without table cache")
+    parser.add_argument("--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help="Table cache directory")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="Table cache size limit [byte]")
+    result_group = parser.add_mutually_exclusive_group()
+    result_group.add_argument(
+        "--summary", action="store_true", help="Output only counts and keys of mismatched entries for each node"
+    )
+    result_group.add_argument("--only-diff", action="store_true", help="Output only mismatched entries (without both)")
+    parser.add_argument(
+        "--probes", type=str, help="Probe addresses/prefixes file for forwarding check (default: all prefixes)"
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="object", help="Backend to find equivalent entries (same result)"
+    )
+    parser.add_argument("--timings", action="store_true", help="Add phase timings (wall/cpu time, entries) to results")
+    parser.add_argument("--profile", type=str, help="Save profile statistics (pstats) to the file")
+    # target
+    parser.add_argument("--network", "-n", required=True, type=str, help="Target network")
+    parser.add_argument("--node", "-d", type=str, help="Target node (device)")
+
+
+def checker_options(args: argparse.Namespace) -> Dict:
+    """Keyword arguments of state checker from the options"""
+    result_mode = "summary" if args.summary else "only_diff" if args.only_diff else "full"
+    return {
+        "debug": args.debug,
+        "table_cache": None if args.no_cache else TableCache(args.cache_dir, args.cache_size, args.debug),
+        "timings": args.timings,
+        "result_mode": result_mode,
+        "probes": read_probes(args.probes) if args.probes else None,
+        "backend": args.backend,
+    }
+
+
+@contextmanager
+def profiling(args: argparse.Namespace) -> Iterator[None]:
+    """Save profile statistics of the block to the file of --profile option (if specified)"""
+    if not args.profile:
+        yield
+        return
+
+    if args.jobs > 1:
+        util.warn("profile covers only the main process (nodes are checked in worker processes)")
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+
+
+def run_check(args: argparse.Namespace, state_checker: StateChecker, output_header: Dict) -> None:
+    """Check the target node (or all nodes) and write results with the header"""
+    if args.node:
+        # for a node
+        node_param = state_checker.find_node_param_by_name(args.node)
+        util.debug(f"node_param: {node_param}", args.debug)
+        if node_param is None:
+            util.error_exit(f"Error: node {args.node} is not found in config")
+        node_results = [state_checker.check_state_table_for_node(args.table, node_param)]
+    else:
+        # for all nodes (results are generated as nodes are checked)
+        node_results = state_checker.iter_state_table_for_nodes(
+            args.table, state_checker.config.original_node_params, args.jobs
+        )
+
+    # output
+    if args.timings and args.output != "ndjson":
+        output_header = {**output_header, "timings": state_checker.global_timer.to_dict()}
+    # NOTICE: timings of serialization are not in the output (printed to stderr)
+    serialize_timer = PhaseTimer(args.timings)
+    write_results(args.output, output_header, node_results, serialize_timer)
+    if args.timings:
+        stderr_timings = serialize_timer.to_dict()
+        if args.output == "ndjson":
+            # ndjson output has no header: config timings are printed to stderr too
+            stderr_timings.update(state_checker.global_timer.to_dict())
+        util.info(f"timings: {json.dumps(stderr_timings)}")
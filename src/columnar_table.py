@@ -0,0 +1,135 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+from base_ospfneigh_table import MATCH_ATTRIBUTES, OspfNeighborTable
+from base_route_table import RouteTable
+from state_table import StateTable, StateTableEntry
+
+# NOTICE: pandas/numpy are imported when columnar backend is used
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# rules to choose one from multiple candidates that have same key (same as find_entry_equiv of each table):
+# groups of columns in order of priority, and in a group, 1st candidate that matches any of the columns is chosen
+ROUTE_MATCH_GROUPS = [[["to"], ["via_key"]]]
+OSPF_MATCH_GROUPS = [[list(attributes)] for attributes in MATCH_ATTRIBUTES]
+
+
+def _route_columns(table: RouteTable) -> Dict[str, List[Any]]:
+    # key and attributes of 1st next-hop (None if the entry has no next-hop)
+    columns = {"key": [], "to": [], "via_key": []}
+    for entry in table.entries:
+        columns["key"].append(table.index_key(entry))
+        nexthop = entry.entries[0].nexthops[0] if entry.entries and entry.entries[0].nexthops else None
+        columns["to"].append(None if nexthop is None else nexthop.to)
+        columns["via_key"].append(None if nexthop is None else nexthop.via_key)
+    return columns
+
+
+def _ospf_neighbor_columns(table: OspfNeighborTable) -> Dict[str, List[Any]]:
+    # NOTICE: undefined attribute is a wildcard (None: not matched)
+    columns = {"key": [], "interface_key": [], "id": []}
+    for entry in table.entries:
+        columns["key"].append(table.index_key(entry))
+        columns["interface_key"].append(None if entry.interface_key == "_undefined_" else entry.interface_key)
+        columns["id"].append(None if entry.id == "_undefined_" else entry.id)
+    return columns
+
+
+class ColumnarTable:
+    """Columnar form of a state table: dictionary-encoded columns (codes and unique values) of entries"""
+
+    def __init__(self, table: StateTable):
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+
+        self.entries: List[StateTableEntry] = table.entries
+        if isinstance(table, RouteTable):
+            columns, self.match_groups = _route_columns(table), ROUTE_MATCH_GROUPS
+        elif isinstance(table, OspfNeighborTable):
+            columns, self.match_groups = _ospf_neighbor_columns(table), OSPF_MATCH_GROUPS
+        else:
+            raise TypeError(f"Columnar backend does not support table: {type(table).__name__}")
+        # column name -> codes (-1: None) and unique values
+        self.columns: Dict[str, Tuple["np.ndarray", "np.ndarray"]] = {
+            name: pd.factorize(pd.Series(values, dtype=object)) for name, values in columns.items()
+        }
+
+
+def _shared_frames(src: ColumnarTable, dst: ColumnarTable) -> Tuple["pd.DataFrame", "pd.DataFrame"]:
+    # re-encode columns of src/dst with shared dictionary (codes of same value are same in src/dst)
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    src_data, dst_data = {}, {}
+    for name, (src_codes, src_uniques) in src.columns.items():
+        dst_codes, dst_uniques = dst.columns[name]
+        shared_codes, _ = pd.factorize(pd.Series(np.concatenate([src_uniques, dst_uniques]), dtype=object))
+        split = len(src_uniques)
+        src_map, dst_map = shared_codes[:split], shared_codes[split:]
+        # NOTICE: code -1 (None) is kept
+        src_data[name] = np.where(src_codes < 0, -1, src_map[np.maximum(src_codes, 0)] if len(src_map) else -1)
+        dst_data[name] = np.where(dst_codes < 0, -1, dst_map[np.maximum(dst_codes, 0)] if len(dst_map) else -1)
+    return pd.DataFrame(src_data), pd.DataFrame(dst_data)
+
+
+def _group_candidates(
+    src_frame: "pd.DataFrame", dst_frame: "pd.DataFrame", pending: "np.ndarray", group: List[List[str]]
+) -> "np.ndarray":
+    # position of 1st candidate (lowest rank) that matches any columns in the group for each dst entry (-1: none)
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    matches = []
+    for columns in group:
+        keys = ["key", *columns]
+        query = dst_frame.loc[pending, keys]
+        query = query[(query[columns] >= 0).all(axis=1)]
+        candidates = src_frame.loc[(src_frame[columns] >= 0).all(axis=1), [*keys, "rank", "pos"]]
+        matches.append(query.reset_index().merge(candidates.drop_duplicates(keys), on=keys)[["index", "rank", "pos"]])
+    best = pd.concat(matches).sort_values(["index", "rank"]).drop_duplicates("index")
+    positions = np.full(len(dst_frame), -1, dtype=np.int64)
+    positions[best["index"].to_numpy()] = best["pos"].to_numpy()
+    return positions
+
+
+def _candidate_positions(src_frame: "pd.DataFrame", dst_frame: "pd.DataFrame", match_groups: List) -> "np.ndarray":
+    # position of src entry equivalent to each dst entry (-1 if not found)
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    # position and rank (order in entries that have same key) of src entries
+    src_frame = src_frame.assign(pos=np.arange(len(src_frame)), rank=src_frame.groupby("key").cumcount())
+    # 1st candidate (default) and number of candidates of each key
+    first_src = src_frame.drop_duplicates("key").set_index("key")["pos"]
+    counts = src_frame.groupby("key").size()
+    positions = dst_frame["key"].map(first_src).fillna(-1).to_numpy(dtype=np.int64, copy=True)
+    multiple = dst_frame["key"].map(counts).fillna(0).to_numpy() > 1
+
+    resolved = np.zeros(len(dst_frame), dtype=bool)
+    for group in match_groups:
+        pending = multiple & ~resolved
+        if not pending.any():
+            break
+        group_positions = _group_candidates(src_frame, dst_frame, pending, group)
+        found = group_positions >= 0
+        positions[found] = group_positions[found]
+        resolved |= found
+    return positions
+
+
+def match_entries(
+    src_table: StateTable, dst_table: StateTable
+) -> Tuple[List[Tuple[StateTableEntry, StateTableEntry]], List[StateTableEntry], List[StateTableEntry]]:
+    """Find entries in both (pairs of src/dst entry), only in src and only in dst by vectorized join
+
+    Same result as StateChecker._match_entries (find_entry_equiv of each entry).
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    src, dst = ColumnarTable(src_table), ColumnarTable(dst_table)
+    src_frame, dst_frame = _shared_frames(src, dst)
+    positions = _candidate_positions(src_frame, dst_frame, src.match_groups)
+    in_dst = np.isin(src_frame["key"].to_numpy(), dst_frame["key"].to_numpy())
+
+    both = [(src.entries[s], dst.entries[d]) for d, s in enumerate(positions.tolist()) if s >= 0]
+    only_src = [src.entries[i] for i in np.nonzero(~in_dst)[0].tolist()]
+    only_dst = [dst.entries[i] for i in np.nonzero(positions < 0)[0].tolist()]
+    return both, only_src, only_dst
@@ -1,9 +1,33 @@
 import os
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import yaml
-from jinja2 import Environment, FileSystemLoader
 import utility as util
 
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+# NOTICE: template environment is shared and compiled templates are cached by this module (not by jinja2)
+# because template name (path) is relative from current directory.
+# jinja2 is imported when a config is loaded at first (not to slow down startup of commands)
+_TEMPLATE_ENV: Optional["Environment"] = None
+# compiled config templates: (absolute path, mtime) -> template
+_TEMPLATE_CACHE: Dict[Tuple[str, int], "Template"] = {}
+# use libyaml-based (fast) loader if available
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def config_template(config_file: str) -> "Template":
+    """Compiled config template (compiled once while the file is not modified)"""
+    global _TEMPLATE_ENV  # pylint: disable=global-statement
+    key = (os.path.abspath(config_file), os.stat(config_file).st_mtime_ns)
+    if key not in _TEMPLATE_CACHE:
+        if _TEMPLATE_ENV is None:
+            from jinja2 import Environment, FileSystemLoader  # pylint: disable=import-outside-toplevel
+
+            _TEMPLATE_ENV = Environment(loader=FileSystemLoader("./", encoding="UTF-8"), cache_size=0)
+        _TEMPLATE_CACHE[key] = _TEMPLATE_ENV.get_template(config_file)
+    return _TEMPLATE_CACHE[key]
+
 
 # pylint: disable=too-many-instance-attributes
 class ConfigLoader:
@@ -17,6 +41,8 @@ class ConfigLoader:
         self.src_ss = src_ss  # source snapshot
         self.dst_ss = dst_ss  # destination snapshot
         self.debug = debug
+        # parsed config data: (network, snapshot) -> config data
+        self._config_data: Dict[Tuple[str, str], Dict] = {}
         self._load_config()
 
     def _load_config(self):
@@ -26,8 +52,12 @@ class ConfigLoader:
 
         config_data = self._read_config(self.network, self.src_ss)
         self.original_node_params = config_data["original_node_params"]
-        self.src_config = self._choose_config(self.src_env, self.src_ss)
-        self.dst_config = self._choose_config(self.dst_env, self.dst_ss)
+        # node name (lower case) -> node param (first one if duplicated)
+        self._node_param_index: Dict[str, Dict] = {}
+        for node_param in self.original_node_params:
+            self._node_param_index.setdefault(node_param["name"].lower(), node_param)
+        self.src_config = self.choose_config(self.src_env, self.src_ss)
+        self.dst_config = self.choose_config(self.dst_env, self.dst_ss)
 
         if self.debug:
             util.debug(f"src_config: {self.src_config}")
@@ -35,15 +65,23 @@ class ConfigLoader:
             util.debug(f"original_node_params: {self.original_node_params}")
 
     def _read_config(self, target_nw: str, target_ss: str) -> Dict:
-        # load config (config template)
-        env = Environment(loader=FileSystemLoader("./", encoding="UTF-8"))
-        template = env.get_template(self.config_file)
-        template_param = {"network_name": target_nw, "snapshot_name": target_ss}
-
-        # render & parse config
-        config_string = template.render(template_param)
-        return yaml.safe_load(config_string)
+        # render & parse config once for each network/snapshot
+        key = (target_nw, target_ss)
+        if key not in self._config_data:
+            template_param = {"network_name": target_nw, "snapshot_name": target_ss}
+            config_string = config_template(self.config_file).render(template_param)
+            self._config_data[key] = yaml.load(config_string, Loader=_SafeLoader)
+        return self._config_data[key]
 
-    def _choose_config(self, target_env: str, target_ss: str) -> Dict:
+    def choose_config(self, target_env: str, target_ss: str) -> Dict:
+        """Config of the environment for the snapshot (in the network)"""
         config_data = self._read_config(self.network, target_ss)
         return config_data[target_env]
+
+    def choose_configs(self, snapshots: List[Tuple[str, str]]) -> List[Dict]:
+        """Configs for snapshots: list of (environment, snapshot)"""
+        return [self.choose_config(env, ss) for env, ss in snapshots]
+
+    def find_node_param(self, node_name: str) -> Optional[Dict]:
+        """Find a node param by name (ignore case)"""
+        return self._node_param_index.get(node_name.lower())
@@ -0,0 +1,140 @@
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+from base_route_table import RouteEntry, RouteTable
+from ip_prefix import format_address, format_prefix, parse_prefix, unpack_prefix
+import utility as util
+
+# NOTICE: numpy (dependency of pandas) is imported when forwarding is checked
+# forwarding of a prefix: nexthop addresses, interfaces (canonical key) and protocols of active routes
+Forwarding = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+FORWARDING_FIELDS = ["nexthop", "interface", "protocol"]
+# probe, longest-match prefix in src/dst (packed, -1 if not found) and changed fields
+ForwardingChange = Tuple[int, int, int, List[str]]
+
+
+def read_probes(file_path: str) -> List[int]:
+    """Read probes (packed prefix) from a file: an IPv4 address or prefix in each line
+
+    Empty lines and comments (after "#") are ignored.
+    """
+    probes = []
+    with open(os.path.expanduser(file_path), "r", encoding="UTF-8") as probe_file:
+        for line_number, line in enumerate(probe_file, start=1):
+            text = line.split("#", 1)[0].strip()
+            if not text:
+                continue
+            probe = parse_prefix(text)
+            if probe is None:
+                util.warn(f"Ignore invalid probe at line {line_number}: {text}")
+                continue
+            probes.append(probe)
+    return probes
+
+
+def format_probe(probe: int) -> str:
+    """Format a probe: address (/32) or prefix"""
+    network, length = unpack_prefix(probe)
+    return format_address(network) if length == 32 else format_prefix(probe)
+
+
+def resolve_forwarding(route_entries: List[RouteEntry]) -> Forwarding:
+    """Forwarding of route entries of a prefix: next-hops of entries that have the best (lowest) preference"""
+    if not route_entries:
+        return (), (), ()
+    best_preference = min(r.preference for r in route_entries)
+    active_entries = [r for r in route_entries if r.preference == best_preference]
+    return (
+        tuple(sorted({n.to for r in active_entries for n in r.nexthops})),
+        tuple(sorted({n.via_key for r in active_entries for n in r.nexthops})),
+        tuple(sorted({r.protocol.lower() for r in active_entries})),
+    )
+
+
+class ForwardingResolver:
+    """Resolve (and memoize) forwarding of longest-match prefixes in a table"""
+
+    def __init__(self, table: RouteTable):
+        self.prefix_index = table.prefix_index()
+        self._forwardings: Dict[int, Forwarding] = {}
+
+    def resolve(self, prefix: int) -> Optional[Forwarding]:
+        """Forwarding of the prefix (packed), None if no prefix (-1)"""
+        if prefix < 0:
+            return None
+        if prefix not in self._forwardings:
+            route_entries = [r for e in self.prefix_index.exact_match(prefix) for r in e.entries]
+            self._forwardings[prefix] = resolve_forwarding(route_entries)
+        return self._forwardings[prefix]
+
+
+def _changed_fields(src_forwarding: Optional[Forwarding], dst_forwarding: Optional[Forwarding]) -> List[str]:
+    if src_forwarding is None or dst_forwarding is None:
+        return [] if src_forwarding is dst_forwarding else ["route"]
+    return [f for f, s, d in zip(FORWARDING_FIELDS, src_forwarding, dst_forwarding) if s != d]
+
+
+def all_prefixes(src_table: RouteTable, dst_table: RouteTable) -> List[int]:
+    """Probes for all prefixes in src/dst table"""
+    return sorted(set(src_table.prefix_index().prefixes()) | set(dst_table.prefix_index().prefixes()))
+
+
+def match_forwarding(src_table: RouteTable, dst_table: RouteTable, probes: Sequence[int]) -> List[ForwardingChange]:
+    """Find probes whose forwarding (longest-match route) is changed between src and dst table
+
+    Longest-match lookup is vectorized, and forwarding is compared once for each pair of src/dst prefixes.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    if len(probes) == 0:
+        return []
+    src_matches = src_table.prefix_index().longest_matches(probes)
+    dst_matches = dst_table.prefix_index().longest_matches(probes)
+    prefix_pairs, pair_indexes = np.unique(np.stack([src_matches, dst_matches], axis=1), axis=0, return_inverse=True)
+    pair_indexes = pair_indexes.reshape(-1)  # index of prefix pair for each probe
+
+    src_resolver, dst_resolver = ForwardingResolver(src_table), ForwardingResolver(dst_table)
+    pair_fields = [
+        _changed_fields(src_resolver.resolve(int(s)), dst_resolver.resolve(int(d))) for s, d in prefix_pairs.tolist()
+    ]
+    changed_pairs = np.array([bool(f) for f in pair_fields])
+    changed_indexes = np.nonzero(changed_pairs[pair_indexes])[0]
+    return [
+        (int(probes[i]), int(src_matches[i]), int(dst_matches[i]), pair_fields[pair_indexes[i]])
+        for i in changed_indexes.tolist()
+    ]
+
+
+def _forwarding_to_dict(resolver: ForwardingResolver, prefix: int) -> Optional[Dict]:
+    forwarding = resolver.resolve(prefix)
+    if forwarding is None:
+        return None
+    return {"prefix": format_prefix(prefix), **dict(zip(FORWARDING_FIELDS, (list(f) for f in forwarding)))}
+
+
+def forwarding_result_to_dict(
+    src_table: RouteTable,
+    dst_table: RouteTable,
+    changes: List[ForwardingChange],
+    probe_count: int,
+    result_mode="full",
+) -> Dict:
+    """Result of forwarding check (changed probes)"""
+    if result_mode == "summary":
+        return {
+            "counts": {"probes": probe_count, "changed": len(changes)},
+            "changed": [format_probe(p) for p, _, _, _ in changes],
+        }
+
+    src_resolver, dst_resolver = ForwardingResolver(src_table), ForwardingResolver(dst_table)
+    return {
+        "probes": probe_count,
+        "changed": [
+            {
+                "destination": format_probe(probe),
+                "diff": fields,
+                "src": _forwarding_to_dict(src_resolver, src_prefix),
+                "dst": _forwarding_to_dict(dst_resolver, dst_prefix),
+            }
+            for probe, src_prefix, dst_prefix, fields in changes
+        ],
+    }
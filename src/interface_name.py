@@ -0,0 +1,56 @@
+import re
+from functools import lru_cache
+
+# full names of cisco/arista interface types (an abbreviation is an unique prefix of them, e.g. "Gi" or "Eth")
+CISCO_INTERFACE_TYPES = [
+    "Ethernet",
+    "FastEthernet",
+    "FortyGigabitEthernet",
+    "GigabitEthernet",
+    "HundredGigE",
+    "Loopback",
+    "Management",
+    "Port-Channel",
+    "TenGigabitEthernet",
+    "Tunnel",
+    "TwentyFiveGigE",
+    "Vlan",
+]
+_CISCO_INTERFACE_RE = re.compile(r"^([A-Za-z-]+)\s*(\d.*)$")
+_JUNIPER_INTERFACE_RE = re.compile(r"^[a-z]+-\d|^(ae|lo|irb|fxp|em|me|vlan)\d*(\.\d+)?$")
+
+
+def _cisco_interface_key(name: str) -> str:
+    match = _CISCO_INTERFACE_RE.match(name)
+    if not match:
+        return name
+    prefix, number = match.group(1).lower(), match.group(2)
+    types = [t for t in CISCO_INTERFACE_TYPES if t.lower().startswith(prefix)]
+    exact_types = [t for t in types if t.lower() == prefix]
+    if exact_types:
+        return f"{exact_types[0]}{number}"
+    if len(types) == 1:
+        return f"{types[0]}{number}"
+    return name  # unknown or ambiguous abbreviation
+
+
+def _juniper_interface_key(name: str) -> str:
+    # logical unit 0 is same as the physical interface (e.g. ge-0/0/0.0 and ge-0/0/0)
+    return name[:-2] if name.endswith(".0") else name
+
+
+@lru_cache(maxsize=65536)
+def interface_key(name: str, vendor: str) -> str:
+    """Canonical key of interface name to compare interfaces
+
+    vendor: format of the name, juniper, cisco (cisco/arista) or batfish (juniper or cisco style name)
+    - juniper: "ge-0/0/0.0" -> "ge-0/0/0" (without unit 0)
+    - cisco: "Gi0/0" -> "GigabitEthernet0/0" (expand abbreviation)
+    """
+    if vendor == "batfish":
+        vendor = "juniper" if _JUNIPER_INTERFACE_RE.match(name) else "cisco"
+    if vendor == "juniper":
+        return _juniper_interface_key(name)
+    if vendor == "cisco":
+        return _cisco_interface_key(name)
+    return name
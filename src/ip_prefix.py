@@ -0,0 +1,154 @@
+from bisect import bisect_left
+import socket
+from typing import TYPE_CHECKING, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+# NOTICE: numpy (dependency of pandas) is imported when batched lookup is used
+if TYPE_CHECKING:
+    import numpy as np
+
+# NOTICE: an IPv4 prefix is packed into an integer: network address (32bit) << 6 | prefix length (0-32)
+# sorted packed prefixes are ordered by network address and prefix length (covered prefixes follow a prefix)
+LENGTH_BITS = 6
+LENGTH_MASK = (1 << LENGTH_BITS) - 1
+NETMASKS = [(0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF for length in range(33)]
+
+ValueT = TypeVar("ValueT")
+
+
+def parse_address(address: str) -> Optional[int]:
+    """Parse IPv4 address ("a.b.c.d", octet may have leading zeros) to integer, None if it is not IPv4 address"""
+    try:
+        # fast path (inet_pton rejects octets that have leading zeros)
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+    except OSError:
+        pass
+    octets = address.split(".")
+    if len(octets) != 4 or not all(o.isdigit() for o in octets):
+        return None
+    value = 0
+    for octet in octets:
+        octet_value = int(octet)
+        if octet_value > 255:
+            return None
+        value = value << 8 | octet_value
+    return value
+
+
+def parse_prefix(prefix: str) -> Optional[int]:
+    """Parse IPv4 prefix ("a.b.c.d/nn" or address as /32) to packed prefix, None if it is not IPv4 prefix
+
+    Host bits are cleared: "010.0.0.1/8" -> 10.0.0.0/8
+    """
+    address, _, length_str = prefix.partition("/")
+    network = parse_address(address)
+    if network is None or (length_str and not length_str.isdigit()):
+        return None
+    length = int(length_str) if length_str else 32
+    if length > 32:
+        return None
+    return pack_prefix(network, length)
+
+
+def pack_prefix(network: int, length: int) -> int:
+    """Packed prefix of network address (integer) and prefix length"""
+    return (network & NETMASKS[length]) << LENGTH_BITS | length
+
+
+def unpack_prefix(packed: int) -> Tuple[int, int]:
+    """Network address (integer) and prefix length of packed prefix"""
+    return packed >> LENGTH_BITS, packed & LENGTH_MASK
+
+
+def format_address(address: int) -> str:
+    """Format IPv4 address (integer) to "a.b.c.d" """
+    return ".".join(str((address >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+
+def format_prefix(packed: int) -> str:
+    """Format packed prefix to "a.b.c.d/nn" """
+    network, length = unpack_prefix(packed)
+    return f"{format_address(network)}/{length}"
+
+
+class PrefixIndex(Generic[ValueT]):
+    """Index of values by IPv4 prefix: exact match, longest-prefix match and covered prefixes
+
+    Longest-prefix match uses a hash table (or a sorted array for batched lookup) for each prefix length
+    (only lengths in the index are looked up) and covered prefixes are found by binary search in sorted prefixes.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, ValueT]]):
+        # packed prefix -> values (in order of items)
+        self._values: Dict[int, List[ValueT]] = {}
+        for packed, value in items:
+            self._values.setdefault(packed, []).append(value)
+        # prefix length -> networks
+        self._networks: Dict[int, Dict[int, int]] = {}
+        for packed in self._values:
+            network, length = unpack_prefix(packed)
+            self._networks.setdefault(length, {})[network] = packed
+        self._lengths = sorted(self._networks, reverse=True)  # longest first
+        self._sorted_prefixes: Optional[List[int]] = None  # built at first query of covered prefixes
+        self._network_arrays: Dict[int, "np.ndarray"] = {}  # sorted networks for each length (batched lookup)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def exact_match(self, packed: int) -> List[ValueT]:
+        """Values of the prefix"""
+        return self._values.get(packed, [])
+
+    def longest_match(self, address: int) -> Optional[int]:
+        """Longest prefix (packed) that contains the address (integer), None if not found"""
+        for length in self._lengths:
+            packed = self._networks[length].get(address & NETMASKS[length])
+            if packed is not None:
+                return packed
+        return None
+
+    def longest_matches(self, prefixes: Sequence[int]) -> "np.ndarray":
+        """Longest prefixes (packed) that contain each of given prefixes (packed, address as /32), -1 if not found
+
+        Vectorized lookup: binary search of all prefixes (numpy array) for each prefix length in the index.
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        probes = np.asarray(prefixes, dtype=np.int64)
+        probe_networks, probe_lengths = probes >> LENGTH_BITS, probes & LENGTH_MASK
+        matches = np.full(len(probes), -1, dtype=np.int64)
+        for length in self._lengths:
+            targets = np.nonzero((matches < 0) & (probe_lengths >= length))[0]
+            if len(targets) == 0:
+                continue
+            if length not in self._network_arrays:
+                self._network_arrays[length] = np.fromiter(sorted(self._networks[length]), dtype=np.int64)
+            networks = self._network_arrays[length]
+            masked = probe_networks[targets] & NETMASKS[length]
+            positions = np.minimum(np.searchsorted(networks, masked), len(networks) - 1)
+            found = networks[positions] == masked
+            matches[targets[found]] = masked[found] << LENGTH_BITS | length
+        return matches
+
+    def prefixes(self) -> List[int]:
+        """All prefixes (packed) in the index, sorted"""
+        if self._sorted_prefixes is None:
+            self._sorted_prefixes = sorted(self._values)
+        return self._sorted_prefixes
+
+    def covering_prefixes(self, packed: int) -> Iterator[int]:
+        """Prefixes (packed) that contain the prefix (include itself), longest first"""
+        network, length = unpack_prefix(packed)
+        for index_length in self._lengths:
+            if index_length > length:
+                continue
+            found = self._networks[index_length].get(network & NETMASKS[index_length])
+            if found is not None:
+                yield found
+
+    def covered_prefixes(self, packed: int) -> List[int]:
+        """Prefixes (packed) contained in the prefix (include itself), in order of network address and length"""
+        sorted_prefixes = self.prefixes()
+        network, length = unpack_prefix(packed)
+        start = bisect_left(sorted_prefixes, packed)
+        end = bisect_left(sorted_prefixes, (network + (1 << (32 - length))) << LENGTH_BITS)
+        return sorted_prefixes[start:end]
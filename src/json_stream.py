@@ -0,0 +1,144 @@
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Iterator, TextIO
+
+DEFAULT_CHUNK_SIZE = 64 * 1024  # characters
+WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+STRUCTURAL_RE = re.compile(r'["\[\]{}]')
+NUMBER_CHARS = frozenset("0123456789.eE+-")  # characters that can continue a number
+
+
+class JsonCursor:
+    """Pull-style (incremental) JSON reader
+
+    Read a JSON document from a file object chunk by chunk. The caller walks the document with iter_object()
+    and iter_array() and must consume each member/element with decode(), skip() or a nested iteration
+    before going to next one. Only decoded values are built as python objects (skipped values are not).
+    """
+
+    def __init__(self, file_io: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._file_io = file_io
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = 0) -> bool:
+        """Read next chunk (at least size characters) into buffer: discard consumed part of the buffer"""
+        chunk = self._file_io.read(max(size, self._chunk_size))
+        if not chunk:
+            self._eof = True
+            return False
+        consumed, self._pos = self._pos, 0
+        self._buffer = self._buffer[consumed:] + chunk
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self) -> str:
+        """Next (non-whitespace) character: empty string at end of the document"""
+        while True:
+            self._pos = WHITESPACE_RE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def _scan_string(self) -> str:
+        # NOTICE: current position is next to the opening quote
+        while True:
+            try:
+                value, self._pos = scanstring(self._buffer, self._pos)
+                return value
+            except json.JSONDecodeError:
+                # string continues to next chunk
+                if not self._fill(len(self._buffer)):
+                    raise
+
+    def iter_object(self) -> Iterator[str]:
+        """Iterate keys of an object: the caller consumes the value of each key"""
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            self._expect('"')
+            key = self._scan_string()
+            self._expect(":")
+            yield key
+            if self.peek() == "}":
+                self._pos += 1
+                return
+            self._expect(",")
+
+    def iter_array(self) -> Iterator[int]:
+        """Iterate indexes of an array: the caller consumes each element"""
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            if self.peek() == "]":
+                self._pos += 1
+                return
+            self._expect(",")
+            index += 1
+
+    def _truncated_number(self, value: Any, end: int) -> bool:
+        # a number ending at the end of buffer or followed by a part of number (e.g. "1." of "1.5" or "1e" of "1e3")
+        # might continue in next chunk
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return end == len(self._buffer) or self._buffer[end] in NUMBER_CHARS
+
+    def decode(self) -> Any:
+        """Decode a value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                if self._eof or not self._truncated_number(value, end):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # read more (grow the read size not to decode a large value many times)
+            self._fill(len(self._buffer))
+
+    def skip(self) -> None:
+        """Skip a value without decoding it"""
+        char = self.peek()
+        if char not in ("{", "["):
+            self.decode()  # scalar
+            return
+
+        depth = 0
+        while True:
+            match = STRUCTURAL_RE.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._fill():
+                    raise self._error("Unterminated value")
+                continue
+
+            self._pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._scan_string()
+            elif char in ("{", "["):
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
@@ -6,12 +6,15 @@ import utility as util
 
 
 class JuniperOspfNeighborTableEntry(OspfNeighborTableEntry):
+    __slots__ = ()
+    VENDOR = "juniper"
+
     def __init__(self, neighbor_data: Dict):
         super().__init__()
 
         self.address = neighbor_data["neighbor-address"][0]["data"]
-        self.interface = neighbor_data["interface-name"][0]["data"]
-        self.state = neighbor_data["ospf-neighbor-state"][0]["data"]
+        self.set_interface(neighbor_data["interface-name"][0]["data"])
+        self.state = util.intern_str(neighbor_data["ospf-neighbor-state"][0]["data"])
         self.id = neighbor_data["neighbor-id"][0]["data"]
         self.priority = int(neighbor_data["neighbor-priority"][0]["data"])
 
@@ -1,25 +1,30 @@
-import copy
 import os
-from typing import Dict, List, NoReturn
+from typing import Dict, List, NoReturn, Optional
 import yaml
 import utility as util
 from base_route_table import RouteEntryNextHop, RouteEntry, RouteTableEntry, RouteTable
+from json_stream import JsonCursor
 
 
 class JuniperRouteEntryNextHop(RouteEntryNextHop):
+    __slots__ = ()
+    VENDOR = "juniper"
+
     def __init__(self, rt_nh: Dict):
         super().__init__()
 
         if "to" in rt_nh:
-            self.to = rt_nh["to"][0]["data"]
+            self.to = util.intern_str(rt_nh["to"][0]["data"])
 
         if "via" in rt_nh:
-            self.via = rt_nh["via"][0]["data"]
+            self.set_via(rt_nh["via"][0]["data"])
         else:
-            self.via = rt_nh["nh-local-interface"][0]["data"]
+            self.set_via(rt_nh["nh-local-interface"][0]["data"])
 
 
 class JuniperRouteEntry(RouteEntry):
+    __slots__ = ()
+
     def __init__(self, rt_entry: Dict):
         super().__init__()
 
@@ -28,16 +33,18 @@ class JuniperRouteEntry(RouteEntry):
                 util.warn_multiple("nh", rt_entry["nh"])
             self.nexthops: List[JuniperRouteEntryNextHop] = [JuniperRouteEntryNextHop(n) for n in rt_entry["nh"]]
         if "nh-type" in rt_entry:
-            self.nexthop_type = rt_entry["nh-type"][0]["data"]
+            self.nexthop_type = util.intern_str(rt_entry["nh-type"][0]["data"])
         if "preference" in rt_entry:
             self.preference = int(rt_entry["preference"][0]["data"])
         if "protocol-name" in rt_entry:
-            self.protocol = rt_entry["protocol-name"][0]["data"]
+            self.protocol = util.intern_str(rt_entry["protocol-name"][0]["data"])
         if "metric" in rt_entry:
             self.metric = int(rt_entry["metric"][0]["data"])
 
 
 class JuniperRouteTableEntry(RouteTableEntry):
+    __slots__ = ()
+
     def __init__(self, rt_data: Dict):
         super().__init__()
         # _debug(f"juniper rt_data: {json.dumps(rt_data)}")
@@ -45,7 +52,7 @@ class JuniperRouteTableEntry(RouteTableEntry):
         if len(rt_data["rt-destination"]) > 1:
             util.warn_multiple("rt-destination", rt_data["rt-destination"])
 
-        self.destination = rt_data["rt-destination"][0]["data"]
+        self.set_destination(rt_data["rt-destination"][0]["data"])
 
         if len(rt_data["rt-entry"]) > 1:
             util.warn_multiple("rt-entry", rt_data["rt-entry"])
@@ -60,32 +67,85 @@ class JuniperRouteTableEntry(RouteTableEntry):
                 expanded_entries.append(entry)  # nothing to do
                 continue
 
-            for nexthop in entry.nexthops:
-                copy_entry = copy.deepcopy(entry)
-                copy_entry.nexthops = [nexthop]
-                expanded_entries.append(copy_entry)
+            expanded_entries.extend(entry.copy_with_nexthops([nexthop]) for nexthop in entry.nexthops)
 
         # !!OVERWRITE!!
         self.entries = expanded_entries
 
 
 class JuniperRouteTable(RouteTable):
-    def __init__(self, file_path: str, debug=False):
+    HAS_RAW_DATA = True
+    # NOTICE: raw data is None if not kept (e.g. table restored from table cache)
+    inet0: Optional[Dict] = None
+
+    def __init__(self, file_path: str, debug=False, keep_raw=False):
         super().__init__(debug)
-        self.data = self._read_json_file(file_path)
 
-        # contains ipv4/v6 routing table as default
-        route_tables = self.data["route-information"][0]["route-table"]
-        # find inet.0 table
+        # contains ipv4/v6 routing table as default: find inet.0 table
         self.table_name = "inet.0"
-        self.inet0 = next(
-            (t for t in route_tables if "table-name" in t and t["table-name"][0]["data"] == self.table_name), None
-        )
-        if self.inet0 is None:
+        # raw data of inet.0 table (table-name and rt): kept only if keep_raw (for debug)
+        self.inet0: Optional[Dict] = {"rt": []} if keep_raw else None
+        # NOTICE: read json incrementally (not to keep whole raw data): it is very verbose and large
+        with open(os.path.expanduser(file_path), "r", encoding="UTF-8") as file_io:
+            found = self._read_top(JsonCursor(file_io))
+        if not found:
             util.error_exit(f"inet.0 is not found in {file_path}")
 
-        # route table entries
-        self.entries = [JuniperRouteTableEntry(e) for e in self.inet0["rt"]]
+    def _read_top(self, cursor: JsonCursor) -> bool:
+        # route-information[0]
+        found = False
+        for key in cursor.iter_object():
+            if key != "route-information":
+                cursor.skip()
+                continue
+            for index in cursor.iter_array():
+                if index == 0:
+                    found = self._read_route_information(cursor)
+                else:
+                    cursor.skip()
+        return found
+
+    def _read_route_information(self, cursor: JsonCursor) -> bool:
+        # route-table[*] (first inet.0)
+        found = False
+        for key in cursor.iter_object():
+            if key != "route-table":
+                cursor.skip()
+                continue
+            for _ in cursor.iter_array():
+                if found:
+                    cursor.skip()
+                else:
+                    found = self._read_route_table(cursor)
+        return found
+
+    def _read_route_table(self, cursor: JsonCursor) -> bool:
+        table_name = None
+        pending_rt = None  # rt found before table-name
+        for key in cursor.iter_object():
+            if key == "table-name":
+                table_name_data = cursor.decode()
+                table_name = table_name_data[0]["data"]
+            elif key == "rt" and table_name is None:
+                pending_rt = cursor.decode()
+            elif key == "rt" and table_name == self.table_name:
+                for _ in cursor.iter_array():
+                    self._add_rt(cursor.decode())
+            else:
+                cursor.skip()
+
+        if table_name != self.table_name:
+            return False
+        for rt_data in pending_rt or []:
+            self._add_rt(rt_data)
+        if self.inet0 is not None:
+            self.inet0["table-name"] = table_name_data
+        return True
+
+    def _add_rt(self, rt_data: Dict) -> NoReturn:
+        self.entries.append(JuniperRouteTableEntry(rt_data))
+        if self.inet0 is not None:
+            self.inet0["rt"].append(rt_data)
 
     def expand_rt_entry(self) -> NoReturn:
         """Expand a table-entry that have multiple route-entries to multiple table-entries that have a route-entry"""
@@ -96,10 +156,7 @@ class JuniperRouteTable(RouteTable):
                 expanded_entries.append(entry)
                 continue
 
-            for nexthop in entry.entries:
-                copy_entry = copy.deepcopy(entry)
-                copy_entry.entries = [nexthop]
-                expanded_entries.append(copy_entry)
+            expanded_entries.extend(entry.copy_with_entries([route_entry]) for route_entry in entry.entries)
 
         # !!OVERWRITE!!
         self.entries = expanded_entries
@@ -1,22 +1,123 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, NoReturn
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, NoReturn, Optional, Tuple, Union
+import gzip
 import re
 import utility as util
 
+# file path or iterable of lines (file object, sys.stdin, captured output, etc.)
+LineSource = Union[str, Iterable[str]]
+
+
+@contextmanager
+def open_lines(source: LineSource) -> Iterator[Iterable[str]]:
+    """Open lines of the source: file path (gzip-compressed if it ends with .gz) or iterable of lines as it is"""
+    if not isinstance(source, str):
+        yield source
+    elif source.endswith(".gz"):
+        with gzip.open(source, "rt", encoding="UTF-8") as file_io:
+            yield file_io
+    else:
+        with open(source, encoding="UTF-8") as file_io:
+            yield file_io
+
+
+def _rename_group(match: re.Match, prefix: str, names: List[Tuple[str, str]]) -> str:
+    # rename named group (or back reference) with the prefix and record (renamed, original) name of the group
+    if match.group(1) == "=":
+        return f"(?P={prefix}{match.group(2)}"  # back reference
+    if not match.group(2).startswith("_"):
+        names.append((f"{prefix}{match.group(2)}", match.group(2)))
+    return f"(?P<{prefix}{match.group(2)}>"
+
+
+class LineMatcher:
+    """Single-pass matcher of match-info list
+
+    All regexps in match-info list are merged into one regexp (alternatives): each alternative is prefixed with
+    lazy `.*?` and anchored at line head, so the first match-info (in list order) that would be found by re.search
+    wins as same as searching them one by one. Named groups are renamed to be unique in the merged regexp
+    (groups named with leading underscore are internal: not included in matched groups).
+    Match-info can have optional "keyword" (literal string that the line must contain): alternatives whose keyword
+    is not in the line are excluded from the merged regexp before matching.
+    """
+
+    def __init__(self, match_info_list: List[Dict]):
+        self.match_info_list = match_info_list
+        self.keywords = sorted({m["keyword"] for m in match_info_list if "keyword" in m})
+        # keyword presence (tuple of bool) -> merged regexp and group table for each alternative
+        self._merged: Dict[Tuple[bool, ...], Tuple[Optional[re.Pattern], List]] = {}
+
+    def _merge(self, presence: Tuple[bool, ...]) -> Tuple[Optional[re.Pattern], List]:
+        present_keywords = {k for k, p in zip(self.keywords, presence) if p}
+        alternatives = []
+        group_table = []
+        for match_info in self.match_info_list:
+            if "keyword" in match_info and match_info["keyword"] not in present_keywords:
+                continue
+
+            prefix = f"_m{len(alternatives)}_"
+            group_names = []
+            rename = partial(_rename_group, prefix=prefix, names=group_names)
+            regexp = re.sub(r"\(\?P(?:<|(=))(\w+)>?", rename, match_info["regexp"])
+            alternatives.append(f"(?P<_m{len(alternatives)}>.*?(?:{regexp}))")
+            group_table.append((match_info, group_names))
+
+        if not alternatives:
+            return None, group_table
+        return re.compile(rf"^(?:{'|'.join(alternatives)})"), group_table
+
+    def match(self, line: str) -> Optional[Tuple[Dict, Dict]]:
+        """Find match-info and matched groups (dict) for the line"""
+        presence = tuple(k in line for k in self.keywords)
+        merged = self._merged.get(presence)
+        if merged is None:
+            merged = self._merged[presence] = self._merge(presence)
+
+        merged_regexp, group_table = merged
+        match = merged_regexp.match(line) if merged_regexp is not None else None
+        if not match:
+            return None
+        match_info, group_names = group_table[int(match.lastgroup[2:])]
+        return match_info, {name: match.group(renamed) for renamed, name in group_names}
+
 
 class Parseable(ABC):
     """Mix-in for cisco(-like) state table which requires regexp string parsing"""
 
+    @classmethod
+    def _line_matcher(cls) -> LineMatcher:
+        # compiled once per class (match-info list is static)
+        matcher = cls.__dict__.get("_compiled_line_matcher")
+        if matcher is None:
+            matcher = LineMatcher(cls._generate_match_info_list())
+            setattr(cls, "_compiled_line_matcher", matcher)
+        return matcher
+
+    def _parse_lines(self, source: LineSource, debug=False) -> NoReturn:
+        # NOTICE: stream lines one by one (not to read whole source into memory)
+        with open_lines(source) as lines:
+            for index, line in enumerate(lines, start=1):
+                line = line.rstrip("\r\n")
+                if debug:
+                    util.debug(f"{index}: LINE={line}", debug)
+                self._parse_line(index, line, debug)
+
+    def _parse_line(self, index: int, line: str, debug=False) -> bool:
+        """Parse a line: override it to parse lines which are not matched with match-info list"""
+        return self._match_line(index, line, debug)
+
     def _match_line(self, index: int, line: str, debug=False) -> bool:
-        matched = False
-        for match_info in self._generate_match_info_list():
+        matched = self._line_matcher().match(line)
+        if matched is None:
+            return False
+
+        match_info, mdict = matched
+        if debug:
             util.debug(f"{index}: regexp={match_info['regexp']}, type={match_info['type']}", debug)
-            match = re.search(match_info["regexp"], line)
-            if match:
-                self._add_entry_by_type(match, match_info)
-                matched = True
-                break
-        return matched
+        self._add_entry_by_type(mdict, match_info)
+        return True
 
     @staticmethod
     @abstractmethod
@@ -24,5 +125,5 @@ class Parseable(ABC):
         pass
 
     @abstractmethod
-    def _add_entry_by_type(self, match: re.Match, match_info: Dict) -> NoReturn:
+    def _add_entry_by_type(self, mdict: Dict, match_info: Dict) -> NoReturn:
         pass
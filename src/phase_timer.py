@@ -0,0 +1,37 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class PhaseTimer:
+    """Accumulate wall time, cpu time, number of calls and entries of each (named) phase
+
+    Phases can be nested (e.g. "parse" in "load"): time of a phase includes its inner phases.
+    """
+
+    def __init__(self, enable=False):
+        self.enable = enable
+        self.phases: Dict[str, Dict] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Dict]:
+        """Measure a phase: caller can add number of processed entries to "entries" of the yielded record"""
+        if not self.enable:
+            yield {"entries": 0}  # dummy record
+            return
+
+        record = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0, "entries": 0})
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall"] += time.perf_counter() - wall_start
+            record["cpu"] += time.process_time() - cpu_start
+            record["calls"] += 1
+
+    def to_dict(self) -> Dict:
+        """Convert self to dict (time in seconds)"""
+        return {
+            name: {**record, "wall": round(record["wall"], 6), "cpu": round(record["cpu"], 6)}
+            for name, record in self.phases.items()
+        }
@@ -0,0 +1,38 @@
+import json
+import sys
+from typing import Dict, Iterable, TextIO
+import yaml
+from phase_timer import PhaseTimer
+
+OUTPUT_FORMATS = ["json", "yaml", "ndjson"]
+# use libyaml-based (fast) dumper if available
+_SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def dump_yaml(data: Dict) -> str:
+    """Convert data to yaml string"""
+    return yaml.dump(data, Dumper=_SafeDumper)
+
+
+def write_results(
+    output_format: str, header: Dict, node_results: Iterable[Dict], timer: PhaseTimer, file_io: TextIO = sys.stdout
+) -> None:
+    """Write results of nodes
+
+    ndjson: a line (json) for each node result, written as soon as the node is checked (header is not written)
+    json/yaml: header and all node results (as "all_results") at once
+    Time of serialization is measured as "serialize" phase of the timer.
+    """
+    if output_format == "ndjson":
+        for node_result in node_results:
+            with timer.phase("serialize") as record:
+                line = json.dumps(node_result)
+                record["entries"] += 1
+            print(line, file=file_io, flush=True)
+        return
+
+    output_data = {**header, "all_results": list(node_results)}
+    with timer.phase("serialize") as record:
+        output_text = json.dumps(output_data) if output_format == "json" else dump_yaml(output_data)
+        record["entries"] += len(output_data["all_results"])
+    print(output_text, file=file_io)
@@ -1,97 +1,427 @@
+import importlib
 import os
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Type, Union
 from base_ospfneigh_table import OspfNeighborTable
 from base_route_table import RouteTable
-from batfish_ospfneigh_table import BatfishOspfNeighborTable
-from batfish_route_table import BatfishRouteTable
-from cisco_ospfneigh_table import CiscoOspfNeighborTable
-from cisco_route_table import CiscoRouteTable
+import columnar_table
 from config_loader import ConfigLoader
-from juniper_ospfneigh_table import JuniperOspfNeighborTable
-from juniper_route_table import JuniperRouteTable
-from state_table import StateTable
+from forwarding_check import all_prefixes, forwarding_result_to_dict, match_forwarding
+from phase_timer import PhaseTimer
+from state_table import StateTable, StateTableEntry
+from table_cache import TableCache
+import utility as util
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# target table name -> method of StateChecker to check the table for a node
+TABLE_CHECKERS = {
+    "route": "_check_route_table_for_node",
+    "ospf_neighbor": "_check_ospf_neighbor_table_for_node",
+    "forwarding": "_check_forwarding_for_node",
+}
+
+# result modes of cross-check
+# - full: all entries (both, only_src and only_dst) and field-level diff of changed pairs in both
+# - only_diff: changed pairs and entries only in src or dst (without both)
+# - summary: number of entries and keys of changed entries and entries only in src or dst
+RESULT_MODES = ["full", "only_diff", "summary"]
+
+# backends to find equivalent entries (same result)
+# - object: find_entry_equiv of each entry
+# - columnar: vectorized join of columnar tables (pandas)
+BACKENDS = ["object", "columnar"]
+
+# vendor table classes (module and class name) for each table and format of state data
+# NOTICE: vendor modules are imported lazily (when a node that has the format is checked)
+TABLE_CLASSES = {
+    ("route", "batfish"): ("batfish_route_table", "BatfishRouteTable"),
+    ("route", "juniper"): ("juniper_route_table", "JuniperRouteTable"),
+    ("route", "cisco"): ("cisco_route_table", "CiscoRouteTable"),
+    ("ospf_neighbor", "batfish"): ("batfish_ospfneigh_table", "BatfishOspfNeighborTable"),
+    ("ospf_neighbor", "juniper"): ("juniper_ospfneigh_table", "JuniperOspfNeighborTable"),
+    ("ospf_neighbor", "cisco"): ("cisco_ospfneigh_table", "CiscoOspfNeighborTable"),
+}
+
+
+# checker in a worker process of parallel check (set once by the pool initializer, not pickled for each node)
+_WORKER_CHECKER: Optional["StateChecker"] = None
+
+
+def _init_worker(checker: "StateChecker") -> None:
+    global _WORKER_CHECKER  # pylint: disable=global-statement
+    _WORKER_CHECKER = checker
+
+
+def _check_node_in_worker(target_table: Union[str, List[str]], node_param: Dict) -> Dict:
+    return _WORKER_CHECKER.check_state_table_for_node(target_table, node_param)
+
+
+def load_table_class(table: str, data_format: str) -> Type[StateTable]:
+    """Table class for the table (route/ospf_neighbor) and the format of state data (batfish/juniper/cisco)"""
+    module_name, class_name = TABLE_CLASSES[(table, data_format)]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def target_tables(tables: Union[str, List[str]]) -> List[str]:
+    """Parse target tables: comma-separated table names (or list of them) or "all" """
+    if tables == "all":
+        return list(TABLE_CHECKERS)
+    if isinstance(tables, str):
+        tables = tables.split(",")
+    table_list = list(dict.fromkeys(t.strip() for t in tables if t.strip()))
+    unknown_tables = [t for t in table_list if t not in TABLE_CHECKERS]
+    if not table_list or unknown_tables:
+        raise ValueError(f"Unknown target table {tables}")
+    return table_list
 
 
 class StateChecker:
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
     def __init__(
-        self, config_file: str, src_env: str, dst_env: str, network: str, src_ss: str, dst_ss: str, debug=False
+        self,
+        config_file: str,
+        src_env: str,
+        dst_env: str,
+        network: str,
+        src_ss: str,
+        dst_ss: str,
+        debug=False,
+        table_cache: Optional[TableCache] = None,
+        timings=False,
+        result_mode="full",
+        probes: Optional[List[int]] = None,
+        backend="object",
     ):
-        self.config = ConfigLoader(config_file, src_env, dst_env, network, src_ss, dst_ss, debug)
         self.debug = debug
+        self.table_cache = table_cache
+        self.timings = timings
+        self.result_mode = result_mode
+        # probes (packed prefix) of forwarding check: all prefixes in src/dst route table if None
+        self.probes = probes
+        self.backend = backend
+        # timer for phases out of nodes (config) and timer for phases in a node (reset for each node)
+        self.global_timer = PhaseTimer(timings)
+        self._timer = PhaseTimer(timings)
+        # tables loaded for a node: (table class, file path) -> table (shared among tables checked for the node)
+        self._node_tables: Optional[Dict[Tuple[Type[StateTable], str], StateTable]] = None
+        with self.global_timer.phase("config"):
+            self.config = ConfigLoader(config_file, src_env, dst_env, network, src_ss, dst_ss, debug)
 
     @staticmethod
-    def _cross_check(src_table: StateTable, dst_table: StateTable) -> Dict:
-        result = {"both": [], "only_src": [], "only_dst": []}
+    def _match_entries(
+        src_table: StateTable, dst_table: StateTable
+    ) -> Tuple[List[Tuple[StateTableEntry, StateTableEntry]], List[StateTableEntry], List[StateTableEntry]]:
+        """Find entries in both (pairs of src/dst entry), only in src and only in dst"""
+        both, only_src, only_dst = [], [], []
         for dst_table_entry in dst_table.entries:
             src_table_entry = src_table.find_entry_equiv(dst_table_entry)
             if src_table_entry:
-                result["both"].append({"src_entry": src_table_entry.to_dict(), "dst_entry": dst_table_entry.to_dict()})
+                both.append((src_table_entry, dst_table_entry))
             else:
-                result["only_dst"].append(dst_table_entry.to_dict())
+                only_dst.append(dst_table_entry)
 
         for src_table_entry in src_table.entries:
             dst_table_entry = dst_table.find_entry_equiv(src_table_entry)
             if dst_table_entry:
                 continue
-            result["only_src"].append(src_table_entry.to_dict())
+            only_src.append(src_table_entry)
 
+        return both, only_src, only_dst
+
+    @staticmethod
+    def _diff_pairs(
+        both: List[Tuple[StateTableEntry, StateTableEntry]], field_diff=True
+    ) -> List[Tuple[StateTableEntry, StateTableEntry, Dict]]:
+        """Pairs in both that have different fields (with the field-level diff, or empty dict if not field_diff)"""
+        if not field_diff:
+            return [(s, d, {}) for s, d in both if not s.equals(d)]
+        # NOTICE: diff() compares canonical form first: fields are made only for changed pairs
+        changed = []
+        for src_entry, dst_entry in both:
+            diff = src_entry.diff(dst_entry)
+            if diff:
+                changed.append((src_entry, dst_entry, diff))
+        return changed
+
+    @staticmethod
+    def _result_to_dict(
+        table: StateTable,
+        both: List[Tuple[StateTableEntry, StateTableEntry]],
+        only_src: List[StateTableEntry],
+        only_dst: List[StateTableEntry],
+        changed: List[Tuple[StateTableEntry, StateTableEntry, Dict]],
+        *,
+        result_mode="full",
+    ) -> Dict:
+        # NOTICE: entries are converted to dict only if they are in the result
+        # table is used to get keys of entries
+        if result_mode == "summary":
+            return {
+                "counts": {
+                    "both": len(both),
+                    "changed": len(changed),
+                    "only_src": len(only_src),
+                    "only_dst": len(only_dst),
+                },
+                "changed": list(dict.fromkeys(table.entry_key(s) for s, _, _ in changed)),
+                "only_src": list(dict.fromkeys(table.entry_key(e) for e in only_src)),
+                "only_dst": list(dict.fromkeys(table.entry_key(e) for e in only_dst)),
+            }
+
+        result = {}
+        if result_mode != "only_diff":
+            result["both"] = [{"src_entry": s.to_dict(), "dst_entry": d.to_dict()} for s, d in both]
+        result["changed"] = [table.changed_record(s, d, diff) for s, d, diff in changed]
+        result["only_src"] = [e.to_dict() for e in only_src]
+        result["only_dst"] = [e.to_dict() for e in only_dst]
         return result
 
+    @staticmethod
+    def cross_check(src_table: StateTable, dst_table: StateTable) -> Dict:
+        """Cross-check entries of src/dst table (full result without digests and phase timings)"""
+        both, only_src, only_dst = StateChecker._match_entries(src_table, dst_table)
+        return StateChecker._result_to_dict(src_table, both, only_src, only_dst, StateChecker._diff_pairs(both))
+
+    def _converted_entries(self, both: List, only_src: List, only_dst: List) -> int:
+        # number of entries converted to dict in the result mode
+        if self.result_mode == "summary":
+            return 0
+        if self.result_mode == "only_diff":
+            return len(only_src) + len(only_dst)
+        return 2 * len(both) + len(only_src) + len(only_dst)
+
+    def _check_tables(self, src_table: StateTable, dst_table: StateTable) -> Dict:
+        # cross-check with phase timings
+        # NOTICE: entries of identical tables are not cross-checked: all entries (of src) are in both and not changed
+        # digests are calculated when tables are built (or restored from table cache)
+        digests = {"src": src_table.digest(), "dst": dst_table.digest()}
+        if digests["src"] == digests["dst"]:
+            with self._timer.phase("to_dict") as record:
+                both = [(e, e) for e in src_table.entries]
+                result = self._result_to_dict(src_table, both, [], [], [], result_mode=self.result_mode)
+                record["entries"] += self._converted_entries(both, [], [])
+            return {"identical": True, "digests": digests, **result}
+
+        with self._timer.phase("cross_check") as record:
+            match_entries = columnar_table.match_entries if self.backend == "columnar" else self._match_entries
+            both, only_src, only_dst = match_entries(src_table, dst_table)
+            record["entries"] += len(src_table.entries) + len(dst_table.entries)
+        with self._timer.phase("diff") as record:
+            # NOTICE: field-level diff is not in summary (entries are not converted to fields)
+            changed = self._diff_pairs(both, self.result_mode != "summary")
+            record["entries"] += len(both)
+        with self._timer.phase("to_dict") as record:
+            result = self._result_to_dict(src_table, both, only_src, only_dst, changed, result_mode=self.result_mode)
+            record["entries"] += self._converted_entries(both, only_src, only_dst)
+        return {"identical": False, "digests": digests, **result}
+
+    def _check_forwarding(self, src_table: RouteTable, dst_table: RouteTable) -> Dict:
+        # forwarding check (longest-match routes of probes) with phase timings
+        digests = {"src": src_table.digest(), "dst": dst_table.digest()}
+        if digests["src"] == digests["dst"]:
+            probe_count = len(src_table.prefix_index()) if self.probes is None else len(self.probes)
+            result = forwarding_result_to_dict(src_table, dst_table, [], probe_count, self.result_mode)
+            return {"identical": True, "digests": digests, **result}
+
+        with self._timer.phase("lookup") as record:
+            probes = all_prefixes(src_table, dst_table) if self.probes is None else self.probes
+            changes = match_forwarding(src_table, dst_table, probes)
+            record["entries"] += len(probes)
+        with self._timer.phase("to_dict") as record:
+            result = forwarding_result_to_dict(src_table, dst_table, changes, len(probes), self.result_mode)
+            record["entries"] += len(changes)
+        return {"identical": False, "digests": digests, **result}
+
+    def _tables_to_dict(self, src_table: StateTable, dst_table: StateTable) -> Tuple[Dict, Dict]:
+        # for debug: all entries of src/dst table
+        with self._timer.phase("to_dict") as record:
+            record["entries"] += len(src_table.entries) + len(dst_table.entries)
+            return src_table.to_dict(), dst_table.to_dict()
+
     def find_node_param_by_name(self, node_name) -> Dict:
         """find a node param by name (ignore case)"""
-        return next(filter(lambda n: n["name"].lower() == node_name.lower(), self.config.original_node_params), None)
+        return self.config.find_node_param(node_name)
 
     @staticmethod
     def _join_as_path(*path) -> str:
         return os.path.expanduser(os.path.join(*path))
 
+    def _keeps_raw(self, table_class: Type[StateTable]) -> bool:
+        # raw data is kept in debug mode (for tables that have it)
+        return self.debug and table_class.HAS_RAW_DATA
+
+    def _build_table(self, table_class: Type[StateTable], file_path: str) -> StateTable:
+        # NOTICE: parsers read state files as stream, so "parse" phase includes file reading
+        with self._timer.phase("parse") as record:
+            if self._keeps_raw(table_class):
+                table = table_class(file_path, self.debug, keep_raw=True)
+            else:
+                table = table_class(file_path, self.debug)
+            record["entries"] += len(table.entries)
+        # expand table-entries which have multiple route-entries/next-hops (juniper)
+        if hasattr(table, "expand_rt_entry"):
+            with self._timer.phase("expand") as record:
+                table.expand_rt_entry()
+                record["entries"] += len(table.entries)
+        # digest of normalized entries (saved with the table in table cache)
+        with self._timer.phase("digest") as record:
+            table.digest()
+            record["entries"] += len(table.entries)
+        return table
+
+    def _load_table(self, table_class: Type[StateTable], file_path: str) -> StateTable:
+        # a table is loaded once while checking a node (e.g. route table for route and forwarding check)
+        if self._node_tables is None:
+            return self._load_table_file(table_class, file_path)
+        key = (table_class, file_path)
+        if key not in self._node_tables:
+            self._node_tables[key] = self._load_table_file(table_class, file_path)
+        return self._node_tables[key]
+
+    def _load_table_file(self, table_class: Type[StateTable], file_path: str) -> StateTable:
+        # "load" phase includes table cache lookup and "parse" (when the table is not cached)
+        with self._timer.phase("load") as record:
+            # NOTICE: cached tables have no raw data (the table is parsed to keep it)
+            if self.table_cache is None or self._keeps_raw(table_class):
+                table = self._build_table(table_class, file_path)
+            else:
+                table = self.table_cache.load_table(
+                    table_class, file_path, lambda: self._build_table(table_class, file_path)
+                )
+            record["entries"] += len(table.entries)
+        return table
+
+    @staticmethod
+    def _data_format(config: Dict, node_param: Dict) -> str:
+        if config["type"] == "batfish":
+            return "batfish"
+        if config["type"] == "emulated" or config["type"] == "original" and node_param["type"] == "juniper":
+            return "juniper"
+        # config type = original and not juniper node
+        return "cisco"
+
     def _route_table(self, config: Dict, node_param: Dict) -> RouteTable:
         node_name = node_param["name"] if config["type"] == "original" else node_param["name"].lower()
         file_name = f"{node_name}{config['routes_file']}"
         file_path = self._join_as_path(config["state_dir"], config["routes_dir"], file_name)
-        if config["type"] == "batfish":
-            return BatfishRouteTable(file_path, self.debug)
-        if config["type"] == "emulated" or config["type"] == "original" and node_param["type"] == "juniper":
-            route_table = JuniperRouteTable(file_path, self.debug)
-            route_table.expand_rt_entry()
-            return route_table
-        # config type = original and not juniper node
-        return CiscoRouteTable(file_path, self.debug)
+        return self._load_table(load_table_class("route", self._data_format(config, node_param)), file_path)
 
     def _ospf_neighbor_table(self, config: Dict, node_param: Dict) -> OspfNeighborTable:
         node_name = node_param["name"] if config["type"] == "original" else node_param["name"].lower()
         file_name = f"{node_name}{config['ospf_neighbors_file']}"
         file_path = self._join_as_path(config["state_dir"], config["ospf_neighbors_dir"], file_name)
-        if config["type"] == "batfish":
-            return BatfishOspfNeighborTable(file_path, self.debug)
-        if config["type"] == "emulated" or config["type"] == "original" and node_param["type"] == "juniper":
-            return JuniperOspfNeighborTable(file_path, self.debug)
-        # config type = original and not juniper node
-        return CiscoOspfNeighborTable(file_path, self.debug)
+        return self._load_table(load_table_class("ospf_neighbor", self._data_format(config, node_param)), file_path)
 
-    def _check_route_table_for_node(self, node_param: Dict) -> Dict:
-        src_rt = self._route_table(self.config.src_config, node_param)
-        dst_rt = self._route_table(self.config.dst_config, node_param)
+    def _check_route_table_for_node(self, node_param: Dict, src_config: Dict, dst_config: Dict) -> Dict:
+        src_rt = self._route_table(src_config, node_param)
+        dst_rt = self._route_table(dst_config, node_param)
         if self.debug:
-            return {"node_param": node_param, "src": src_rt.to_dict(), "dst": dst_rt.to_dict()}
-        return {"node_param": node_param, "result": self._cross_check(src_rt, dst_rt)}
+            src_dict, dst_dict = self._tables_to_dict(src_rt, dst_rt)
+            return {"node_param": node_param, "src": src_dict, "dst": dst_dict}
+        return {"node_param": node_param, "result": self._check_tables(src_rt, dst_rt)}
 
-    def _check_ospf_neighbor_table_for_node(self, node_param: Dict) -> Dict:
+    def _check_ospf_neighbor_table_for_node(self, node_param: Dict, src_config: Dict, dst_config: Dict) -> Dict:
         # ignore non-ospf-speaker
         if node_param["ospf"] is False:
             return {"node_param": node_param, "result": {}, "note": "ignored (non-ospf-speaker)"}
 
-        src_ospf_neigh = self._ospf_neighbor_table(self.config.src_config, node_param)
-        dst_ospf_neigh = self._ospf_neighbor_table(self.config.dst_config, node_param)
+        src_ospf_neigh = self._ospf_neighbor_table(src_config, node_param)
+        dst_ospf_neigh = self._ospf_neighbor_table(dst_config, node_param)
         if self.debug:
-            return {"node_param": node_param, "src": src_ospf_neigh.to_dict(), "dst": dst_ospf_neigh.to_dict()}
-        return {"node_param": node_param, "result": self._cross_check(src_ospf_neigh, dst_ospf_neigh)}
+            src_dict, dst_dict = self._tables_to_dict(src_ospf_neigh, dst_ospf_neigh)
+            return {"node_param": node_param, "src": src_dict, "dst": dst_dict}
+        return {"node_param": node_param, "result": self._check_tables(src_ospf_neigh, dst_ospf_neigh)}
 
-    def check_state_table_for_node(self, target_table: str, node_param: Dict) -> Dict:
-        """Exec cross-check for a node in src/dst environments"""
-        if target_table not in ["route", "ospf_neighbor"]:
-            return {"type": "error", "message": f"Unknown target table {target_table}"}
+    def _check_forwarding_for_node(self, node_param: Dict, src_config: Dict, dst_config: Dict) -> Dict:
+        src_rt = self._route_table(src_config, node_param)
+        dst_rt = self._route_table(dst_config, node_param)
+        if self.debug:
+            src_dict, dst_dict = self._tables_to_dict(src_rt, dst_rt)
+            return {"node_param": node_param, "src": src_dict, "dst": dst_dict}
+        return {"node_param": node_param, "result": self._check_forwarding(src_rt, dst_rt)}
+
+    def _check_state_table_for_pair(
+        self, target_table: Union[str, List[str]], node_param: Dict, src_config: Dict, dst_config: Dict
+    ) -> Dict:
+        try:
+            tables = target_tables(target_table)
+        except ValueError as error:
+            return {"type": "error", "message": str(error)}
+
+        if len(tables) == 1:
+            return getattr(self, TABLE_CHECKERS[tables[0]])(node_param, src_config, dst_config)
+
+        # multiple tables: combine results of each table
+        table_results = {}
+        for table in tables:
+            result = getattr(self, TABLE_CHECKERS[table])(node_param, src_config, dst_config)
+            table_results[table] = {k: v for k, v in result.items() if k != "node_param"}
+        return {"node_param": node_param, "tables": table_results}
+
+    def check_state_table_for_node(self, target_table: Union[str, List[str]], node_param: Dict) -> Dict:
+        """Exec cross-check for a node in src/dst environments
+
+        target_table is a table name, comma-separated table names (or list of them) or "all".
+        """
+        self._timer = PhaseTimer(self.timings)
+        self._node_tables = {}
+        try:
+            result = self._check_state_table_for_pair(
+                target_table, node_param, self.config.src_config, self.config.dst_config
+            )
+            return self._with_timings(result)
+        finally:
+            # release tables of the node
+            self._node_tables = None
+
+    def _with_timings(self, result: Dict) -> Dict:
+        # add phase timings of the node
+        if self.timings:
+            result["timings"] = self._timer.to_dict()
+        return result
 
-        if target_table == "route":
-            return self._check_route_table_for_node(node_param)
-        return self._check_ospf_neighbor_table_for_node(node_param)
+    def check_state_table_for_nodes(
+        self, target_table: Union[str, List[str]], node_params: List[Dict], jobs=1
+    ) -> List[Dict]:
+        """Exec cross-check for nodes in src/dst environments (results are in order of node_params)
+
+        When jobs > 1, nodes are checked in parallel by a process pool and an error in a node is reported
+        as the result of the node instead of aborting all.
+        """
+        return list(self.iter_state_table_for_nodes(target_table, node_params, jobs))
+
+    def iter_state_table_for_nodes(
+        self, target_table: Union[str, List[str]], node_params: List[Dict], jobs=1
+    ) -> Iterator[Dict]:
+        """Exec cross-check for nodes and yield result of each node as soon as it is checked (in order of node_params)
+
+        See check_state_table_for_nodes about jobs.
+        """
+        if jobs <= 1:
+            for node_param in node_params:
+                util.debug(f"node_param: {node_param}", self.debug)
+                yield self.check_state_table_for_node(target_table, node_param)
+            return
+
+        # pylint: disable=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor  # only for parallel check
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(self,)) as executor:
+            futures = [executor.submit(_check_node_in_worker, target_table, n) for n in node_params]
+            try:
+                for future, node_param in zip(futures, node_params):
+                    yield self._node_result(future, node_param)
+            finally:
+                # cancel pending nodes when interrupted (e.g. Ctrl-C) or results are not consumed
+                for future in futures:
+                    future.cancel()
+
+    @staticmethod
+    def _node_result(future: "Future", node_param: Dict) -> Dict:
+        try:
+            return future.result()
+        # NOTICE: catch SystemExit too (util.error_exit in worker), but not KeyboardInterrupt (Ctrl-C)
+        except (Exception, SystemExit) as error:  # pylint: disable=broad-except
+            util.error(f"check failed in node {node_param['name']}: {error!r}")
+            return {"node_param": node_param, "type": "error", "message": f"{type(error).__name__}: {error}"}
@@ -0,0 +1,76 @@
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple, Union
+from phase_timer import PhaseTimer
+from state_checker import StateChecker
+from table_cache import TableCache
+import utility as util
+
+
+class StateMatrixChecker(StateChecker):
+    """Cross-check state tables among multiple snapshots (every pair of them)
+
+    Tables of a node are loaded once for each snapshot and all pairs of snapshots are checked from memory.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        config_file: str,
+        network: str,
+        snapshots: List[Tuple[str, str]],
+        debug=False,
+        table_cache: Optional[TableCache] = None,
+        timings=False,
+        result_mode="full",
+        probes: Optional[List[int]] = None,
+        backend="object",
+    ):
+        if len(snapshots) < 2:
+            util.error_exit(f"Error: matrix check requires 2 or more snapshots: {snapshots}")
+
+        (src_env, src_ss), (dst_env, dst_ss) = snapshots[0], snapshots[1]
+        super().__init__(
+            config_file,
+            src_env,
+            dst_env,
+            network,
+            src_ss,
+            dst_ss,
+            debug,
+            table_cache,
+            timings,
+            result_mode,
+            probes,
+            backend,
+        )
+        self.snapshots = snapshots  # list of (env, snapshot)
+        with self.global_timer.phase("config"):
+            self.snapshot_configs = self.config.choose_configs(snapshots)
+
+    def snapshot_pairs(self) -> List[Tuple[int, int]]:
+        """Pairs of snapshot index (src, dst) to check"""
+        return list(combinations(range(len(self.snapshots)), 2))
+
+    def check_state_table_for_node(self, target_table: Union[str, List[str]], node_param: Dict) -> Dict:
+        """Exec cross-check for a node among all pairs of snapshots"""
+        self._node_tables = {}
+        self._timer = PhaseTimer(self.timings)
+        try:
+            pair_results = []
+            for src_index, dst_index in self.snapshot_pairs():
+                result = self._check_state_table_for_pair(
+                    target_table, node_param, self.snapshot_configs[src_index], self.snapshot_configs[dst_index]
+                )
+                pair_results.append(
+                    {
+                        "src_env": self.snapshots[src_index][0],
+                        "src_snapshot": self.snapshots[src_index][1],
+                        "dst_env": self.snapshots[dst_index][0],
+                        "dst_snapshot": self.snapshots[dst_index][1],
+                        **{k: v for k, v in result.items() if k != "node_param"},
+                    }
+                )
+            return self._with_timings({"node_param": node_param, "pairs": pair_results})
+        finally:
+            # release tables of the node
+            self._node_tables = None
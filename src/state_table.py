@@ -1,30 +1,164 @@
 from abc import ABC, abstractmethod
+import copy
+import hashlib
 import os
 import json
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
 
 
 class StateTableEntry(ABC):
     """Abstract class of state table entry"""
 
+    # NOTICE: entries have no instance dict (__slots__) because a table may have huge number of entries.
+    # subclasses must define __slots__ too.
+    __slots__ = ("_canonical_hash",)
+    # bits of hash of canonical form
+    HASH_BITS = 128
+
+    def __init__(self):
+        self._canonical_hash: Optional[int] = None  # cache of canonical_hash()
+
     @abstractmethod
     def to_dict(self) -> Dict:
         """Convert self to dict"""
 
+    @abstractmethod
+    def canonical(self) -> Tuple:
+        """Canonical form (tuple of all compared values) of self: equal entries have equal canonical form"""
+
+    @abstractmethod
+    def fields(self) -> Dict[str, Any]:
+        """Compared fields of self (field name -> value)"""
+
+    def canonical_hash(self) -> int:
+        """Hash of canonical form: computed once (entry must not be changed after that, except copy of it)"""
+        if self._canonical_hash is None:
+            entry_bytes = repr(self.canonical()).encode("UTF-8")
+            entry_hash = hashlib.blake2b(entry_bytes, digest_size=self.HASH_BITS // 8).digest()
+            self._canonical_hash = int.from_bytes(entry_hash, "big")
+        return self._canonical_hash
+
+    def shallow_copy(self) -> "StateTableEntry":
+        """Shallow copy of self to be changed (without cached hash)"""
+        entry = copy.copy(self)
+        StateTableEntry.__init__(entry)  # clear cached hash
+        return entry
+
+    def equals(self, other: "StateTableEntry") -> bool:
+        """Self and other have same canonical form (compared by its hash)"""
+        return self.canonical_hash() == other.canonical_hash()
+
+    def diff(self, other: "StateTableEntry") -> Dict[str, Dict]:
+        """Fields that differ between self (src) and other (dst): field name -> {"src": value, "dst": value}"""
+        if self.equals(other):
+            return {}
+        self_fields, other_fields = self.fields(), other.fields()
+        diff = {}
+        for name, value in self_fields.items():
+            other_value = other_fields.get(name)
+            if value != other_value:
+                diff[name] = {"src": value, "dst": other_value}
+        for name, other_value in other_fields.items():
+            if name not in self_fields:
+                diff[name] = {"src": None, "dst": other_value}
+        return diff
+
 
 class StateTable(ABC):
     """Abstract class of state table"""
 
+    # version of normalized entries made by the parser: bump it to invalidate table cache when the parser changes
+    PARSER_VERSION = 7
+    # digest of a table is sum of hash of canonical form of entries (modulo 2^128)
+    DIGEST_BITS = StateTableEntry.HASH_BITS
+    # constructor accepts keep_raw to keep raw data of state file (for debug)
+    HAS_RAW_DATA = False
+
     def __init__(self, debug=False):
         """Constructor"""
         self.table_name = "_undefined_"
         self.entries: List[StateTableEntry] = []
         self.debug = debug
+        # data derived from entries (index, digest, etc.): name -> (entries, size of entries, data)
+        # NOTICE: derived data is made lazily and remade when entries are replaced/appended
+        self._derived_data: Dict[str, Tuple[List[StateTableEntry], int, Any]] = {}
 
     @abstractmethod
     def find_entry_equiv(self, entry: StateTableEntry) -> Optional[StateTableEntry]:
         """Find an entry equivalent given one"""
 
+    @staticmethod
+    @abstractmethod
+    def _index_key(entry: StateTableEntry) -> Hashable:
+        """Key to index an entry"""
+
+    def entry_key(self, entry: StateTableEntry) -> Hashable:
+        """Key of an entry (destination, neighbor address, etc.)"""
+        return self._index_key(entry)
+
+    def changed_record(self, src_entry: StateTableEntry, dst_entry: StateTableEntry, diff: Dict) -> Dict:
+        """Record of a changed pair of entries in result (key and field-level diff)"""
+        # pylint: disable=unused-argument
+        return {"key": self.entry_key(src_entry), "diff": diff}
+
+    def index_key(self, entry: StateTableEntry) -> Hashable:
+        """Key to find equivalent entries (entries are indexed by it)"""
+        return self._index_key(entry)
+
+    @staticmethod
+    def _secondary_keys(entry: StateTableEntry) -> Iterable[Hashable]:  # pylint: disable=unused-argument
+        """Keys to index an entry among entries that have same key (e.g. key with next-hop of a route)"""
+        return ()
+
+    def _derived(self, name: str, build: Callable[[], Any]) -> Any:
+        entries, size, data = self._derived_data.get(name, (None, -1, None))
+        if entries is not self.entries or size != len(self.entries):
+            data = build()
+            self._set_derived(name, data)
+        return data
+
+    def _set_derived(self, name: str, data: Any) -> None:
+        self._derived_data[name] = (self.entries, len(self.entries), data)
+
+    def _build_index(
+        self,
+    ) -> Tuple[Dict[Hashable, List[StateTableEntry]], Dict[Hashable, Tuple[int, StateTableEntry]]]:
+        # key -> entries and secondary key -> 1st entry (and its position) in entries that have same key
+        entry_index: Dict[Hashable, List[StateTableEntry]] = {}
+        for entry in self.entries:
+            entry_index.setdefault(self._index_key(entry), []).append(entry)
+        # NOTICE: secondary index is used only to choose one from multiple entries that have same key
+        secondary_index: Dict[Hashable, Tuple[int, StateTableEntry]] = {}
+        for entries in entry_index.values():
+            if len(entries) < 2:
+                continue
+            for position, entry in enumerate(entries):
+                for secondary_key in self._secondary_keys(entry):
+                    secondary_index.setdefault(secondary_key, (position, entry))
+        return entry_index, secondary_index
+
+    def _find_all_entries_by_key(self, key: Hashable) -> List[StateTableEntry]:
+        entry_index, _ = self._derived("index", self._build_index)
+        return entry_index.get(key, [])
+
+    def _find_first_entry_by_keys(self, secondary_keys: Iterable[Hashable]) -> Optional[StateTableEntry]:
+        """Find 1st entry (in entries that have same key) that has any of given secondary keys"""
+        _, secondary_index = self._derived("index", self._build_index)
+        found = [secondary_index[k] for k in secondary_keys if k in secondary_index]
+        return min(found, key=lambda f: f[0])[1] if found else None
+
+    def _calc_digest(self) -> str:
+        total = sum(entry.canonical_hash() for entry in self.entries)
+        return f"{total % (1 << self.DIGEST_BITS):0{self.DIGEST_BITS // 4}x}"
+
+    def digest(self) -> str:
+        """Order-independent digest (hex) of entries: tables that have same entries have same digest"""
+        return self._derived("digest", self._calc_digest)
+
+    def set_digest(self, digest: str) -> None:
+        """Set digest of current entries (e.g. restored from table cache)"""
+        self._set_derived("digest", digest)
+
     def to_dict(self) -> Dict:
         """Convert self to dict"""
         return {"table_name": self.table_name, "entries": [e.to_dict() for e in self.entries]}
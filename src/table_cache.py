@@ -0,0 +1,129 @@
+import hashlib
+import os
+import pickle
+from typing import Callable, Dict, List, Optional, Tuple, Type
+from state_table import StateTable
+import utility as util
+
+DEFAULT_CACHE_DIR = "~/.cache/state_cross_checker"
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024  # bytes
+CACHE_FILE_SUFFIX = ".pickle"
+# files are evicted until total size is below this ratio of max size (not to evict and scan at every write)
+EVICT_RATIO = 0.9
+
+
+class TableCache:
+    """On-disk cache of parsed (normalized) state tables
+
+    A cached table is keyed by its source file (path, mtime, size and content hash) and the parser
+    (table class and its PARSER_VERSION). It holds only table name, entries and their digest (not raw source data).
+    Cache files are evicted in least-recently-used order when total size of the cache exceeds max_size
+    (until it is below EVICT_RATIO of max_size).
+    Total size is scanned at first write and estimated by adding written files after that (the cache directory
+    is scanned again only to evict files), so files written by other processes are counted at next scan.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size: int = DEFAULT_CACHE_SIZE, debug=False):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size
+        self.debug = debug
+        self._total_size: Optional[int] = None  # estimated total size of cache files (None: not scanned)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _file_digest(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file_io:
+            for chunk in iter(lambda: file_io.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _cache_key(self, table_class: Type[StateTable], file_path: str) -> str:
+        stat = os.stat(file_path)
+        key_items = [
+            table_class.__module__,
+            table_class.__qualname__,
+            str(table_class.PARSER_VERSION),
+            os.path.abspath(file_path),
+            str(stat.st_mtime_ns),
+            str(stat.st_size),
+            self._file_digest(file_path),
+        ]
+        return hashlib.sha256("\0".join(key_items).encode("UTF-8")).hexdigest()
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{CACHE_FILE_SUFFIX}")
+
+    def _read(self, cache_path: str) -> Optional[Dict]:
+        try:
+            with open(cache_path, "rb") as cache_file:
+                cache_data = pickle.load(cache_file)
+            os.utime(cache_path)  # mark as recently used
+            return cache_data
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+            util.warn(f"Ignore broken table cache: {cache_path} ({error})")
+            return None
+
+    def _write(self, cache_path: str, cache_data: Dict) -> None:
+        # write atomically (cache may be shared among processes)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as cache_file:
+            pickle.dump(cache_data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            file_size = cache_file.tell()
+        os.replace(tmp_path, cache_path)
+
+        if self._total_size is None:
+            self._total_size = sum(size for _, size, _ in self._cache_files())
+        else:
+            self._total_size += file_size
+        if self._total_size > self.max_size:
+            self._evict()
+
+    def _cache_files(self) -> List[Tuple[int, int, str]]:
+        # (mtime, size, path) of cache files
+        cache_files = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(CACHE_FILE_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # removed by other process
+            cache_files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return cache_files
+
+    def _evict(self) -> None:
+        cache_files = self._cache_files()
+        total_size = sum(size for _, size, _ in cache_files)
+        for _, size, path in sorted(cache_files):
+            if total_size <= self.max_size * EVICT_RATIO:
+                break
+            util.debug(f"evict table cache: {path}", self.debug)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+        self._total_size = total_size
+
+    def load_table(
+        self, table_class: Type[StateTable], file_path: str, builder: Callable[[], StateTable]
+    ) -> StateTable:
+        """Load a table from cache, or build (parse) the table by builder and cache it"""
+        cache_path = self._cache_path(self._cache_key(table_class, file_path))
+        cache_data = self._read(cache_path)
+        if cache_data is not None:
+            util.debug(f"table cache hit: {file_path} -> {cache_path}", self.debug)
+            table = table_class.__new__(table_class)
+            StateTable.__init__(table, self.debug)
+            table.table_name = cache_data["table_name"]
+            table.entries = cache_data["entries"]
+            if "digest" in cache_data:
+                table.set_digest(cache_data["digest"])
+            return table
+
+        table = builder()
+        self._write(cache_path, {"table_name": table.table_name, "entries": table.entries, "digest": table.digest()})
+        return table
@@ -1,6 +1,6 @@
 import sys
 import json
-from typing import Dict, NoReturn
+from typing import Any, Dict, NoReturn
 
 
 def debug(message: str, enable=False) -> NoReturn:
@@ -20,6 +20,11 @@ def error_exit(message: str) -> NoReturn:
     sys.exit(1)
 
 
+def info(message: str) -> NoReturn:
+    """information message"""
+    print(f"INFO: {message}", file=sys.stderr)
+
+
 def warn(message: str) -> NoReturn:
     """warning message"""
     print(f"WARNING: {message}", file=sys.stderr)
@@ -28,3 +33,8 @@ def warn(message: str) -> NoReturn:
 def warn_multiple(key: str, data: Dict) -> NoReturn:
     """specific warning message"""
     print(f"WARNING: multiple {key}: {json.dumps(data)}", file=sys.stderr)
+
+
+def intern_str(value: Any) -> Any:
+    """Intern a string that appears repeatedly in a table (protocol, interface name, etc.)"""
+    return sys.intern(value) if isinstance(value, str) else value